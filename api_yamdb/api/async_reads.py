@@ -0,0 +1,130 @@
+import asyncio
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+
+READ_PATHS = re.compile(
+    r'^/api/v1/titles/(\d+/(reviews/(\d+/comments/)?)?)?$'
+)
+
+
+def is_pooled_read(scope):
+    if scope['type'] != 'http' or scope['method'] not in ('GET', 'HEAD'):
+        return False
+    return READ_PATHS.match(scope['path']) is not None
+
+
+def build_environ(scope, body):
+    """WSGI-окружение запроса по ASGI-области (PEP 3333)."""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode(
+            'latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope['headers']:
+        name = name.decode('latin1').upper().replace('-', '_')
+        if name not in ('CONTENT_LENGTH', 'CONTENT_TYPE'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin1')
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+    return environ
+
+
+def run_wsgi(application, environ, send):
+    """Выполняет запрос в текущем потоке и передаёт ответ через
+    ``send`` по мере готовности. Тело потокового ответа (NDJSON)
+    читается здесь же: его генератор держит курсор соединения этого
+    потока. ``send`` ждёт отправки каждой части, поэтому медленный
+    клиент притормаживает чтение из базы, а не копит ответ
+    в памяти."""
+    started = []
+
+    def start_response(status, headers, exc_info=None):
+        started[:] = [int(status.split(' ', 1)[0]), headers]
+
+    result = application(environ, start_response)
+    try:
+        send({
+            'type': 'http.response.start',
+            'status': started[0],
+            'headers': [(name.encode('latin1'), value.encode('latin1'))
+                        for name, value in started[1]],
+        })
+        if environ['REQUEST_METHOD'] != 'HEAD':
+            for chunk in result:
+                if chunk:
+                    send({'type': 'http.response.body', 'body': chunk,
+                          'more_body': True})
+        send({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] != 'http.request':
+            return body
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+class PooledReads:
+    """ASGI-обёртка, которая выполняет горячие чтения в ограниченном
+    пуле потоков.
+
+    Синхронные представления Django под ASGI выполняются в одном
+    общем потоке, и медленный запрос к базе задерживает все
+    остальные. Здесь запрос к спискам и карточкам произведений,
+    к отзывам и комментариям, включая выгрузки NDJSON, проходит
+    обычный синхронный путь (``WSGIHandler`` с теми же middleware
+    и представлениями) в одном из ``ASYNC_READ_THREADS`` потоков
+    со своим соединением с базой, а цикл событий в это время
+    обслуживает другие запросы.
+    Остальные запросы передаются ``application``.
+    """
+
+    def __init__(self, application, threads=None):
+        self.application = application
+        self.handler = WSGIHandler()
+        self.pool = ThreadPoolExecutor(
+            max_workers=threads or settings.ASYNC_READ_THREADS,
+            thread_name_prefix='api-read'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if not is_pooled_read(scope):
+            await self.application(scope, receive, send)
+            return
+        environ = build_environ(scope, await read_body(receive))
+        loop = asyncio.get_running_loop()
+
+        def send_from_thread(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        await loop.run_in_executor(self.pool, run_wsgi, self.handler,
+                                   environ, send_from_thread)
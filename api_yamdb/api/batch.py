@@ -0,0 +1,100 @@
+import logging
+from io import BytesIO
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+from rest_framework import permissions
+
+from .memo import clear_memo
+from .renderers import FastJSONRenderer
+
+# Заголовки запроса, которые не наследуются подзапросами.
+SKIPPED_META = (
+    'CONTENT_TYPE', 'CONTENT_LENGTH', 'QUERY_STRING',
+    'HTTP_ACCEPT', 'HTTP_ACCEPT_ENCODING',
+    'HTTP_IF_MATCH', 'HTTP_IF_NONE_MATCH',
+    'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_UNMODIFIED_SINCE',
+)
+
+logger = logging.getLogger(__name__)
+
+renderer = FastJSONRenderer()
+
+
+def build_subrequest(request, item):
+    """Создаёт подзапрос с заголовками и пользователем родительского
+    запроса. JWT повторно не проверяется."""
+    path, _, query_string = item['path'].partition('?')
+    body = b'' if item.get('body') is None else renderer.render(item['body'])
+    environ = {
+        key: value for key, value in request.META.items()
+        if isinstance(value, str) and key not in SKIPPED_META
+    }
+    environ.update({
+        'REQUEST_METHOD': item['method'],
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': query_string,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': BytesIO(body),
+        'wsgi.url_scheme': request.scheme,
+    })
+    subrequest = WSGIRequest(environ)
+    # Тот же механизм принудительной аутентификации, что и в
+    # APIRequestFactory: подзапрос получает уже известного пользователя.
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest, path
+
+
+def call_view(match, subrequest):
+    """Выполняет представление подзапроса. Ошибка одного подзапроса
+    становится ответом 500 этого элемента, а не всего пакета."""
+    try:
+        response = match.func(subrequest, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    except Exception:
+        logger.exception('Batch subrequest %s %s failed',
+                         subrequest.method, subrequest.path)
+        return 500, renderer.render({'detail': 'Ошибка сервера.'})
+    if response.streaming:
+        response.close()
+        return 406, renderer.render({
+            'detail': 'Потоковые ответы в пакетных запросах '
+                      'не поддерживаются.'
+        })
+    content_type = response.get('Content-Type', '')
+    if not response.content or not content_type.startswith(
+            'application/json'):
+        return response.status_code, b'null'
+    return response.status_code, response.content
+
+
+def run_subrequest(request, item):
+    """Выполняет подзапрос и возвращает статус и тело ответа."""
+    subrequest, path = build_subrequest(request, item)
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return 404, renderer.render({'detail': 'Страница не найдена.'})
+    if match.url_name == 'batch':
+        return 400, renderer.render(
+            {'detail': 'Вложенные пакетные запросы не поддерживаются.'}
+        )
+    try:
+        return call_view(match, subrequest)
+    finally:
+        if item['method'] not in permissions.SAFE_METHODS:
+            clear_memo()
+
+
+def render_batch(results):
+    """Склеивает ответы подзапросов в JSON-массив без повторной
+    сериализации их тел."""
+    return b'[' + b','.join(
+        b'{"status":%d,"body":%s}' % (status, body)
+        for status, body in results
+    ) + b']'
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """Очередь сообщений одного подписчика в его цикле событий.
+    Если подписчик не успевает читать, старые сообщения
+    вытесняются новыми."""
+
+    def __init__(self, channel, size):
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=size)
+
+    def put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """Брокер сообщений внутри процесса.
+
+    ``publish`` можно вызывать из любого потока: сообщение передаётся
+    в цикл событий каждого подписчика. Подписчики из других процессов
+    сообщений не получают — для нескольких процессов нужен брокер
+    с общим хранилищем с тем же интерфейсом (``EVENTS_BROKER``).
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel, settings.EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions[subscription.channel]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.channel]
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put,
+                                                       message)
+            except RuntimeError:
+                # Цикл подписчика уже закрыт, отписка вот-вот случится.
+                pass
+
+
+broker = import_string(settings.EVENTS_BROKER)()
@@ -0,0 +1,139 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+from reviews.models import Title, TitleGenre
+from reviews.rollups import move_titles, title_dimensions
+
+from .serializers import TitleSerializer
+from .signals import title_changed
+
+id_field = serializers.IntegerField(min_value=1)
+
+
+def parse_id(item):
+    """Возвращает id элемента пачки (``None`` для нового
+    произведения) или ошибку проверки."""
+    if not isinstance(item, dict):
+        return None, {'non_field_errors': ['Ожидался объект.']}
+    if 'id' not in item:
+        return None, None
+    try:
+        return id_field.run_validation(item['id']), None
+    except serializers.ValidationError as error:
+        return None, {'id': error.detail}
+
+
+def validate_titles(items):
+    """Проверяет произведения пачки по отдельности.
+
+    Возвращает список ``(instance, validated_data)`` и список ошибок
+    той же длины, что и ``items``. Существующие произведения
+    выбираются одним запросом, slug жанров и категорий разрешаются
+    через кэш каталога.
+    """
+    parsed = [parse_id(item) for item in items]
+    instances = Title.objects.filter(is_hidden=False).in_bulk(
+        [pk for pk, error in parsed if pk is not None]
+    )
+    valid, errors = [], []
+    for item, (pk, error) in zip(items, parsed):
+        instance = None if pk is None else instances.get(pk)
+        if error is None and pk is not None and instance is None:
+            error = {'id': ['Произведение не найдено.']}
+        if error is not None:
+            valid.append(None)
+            errors.append(error)
+            continue
+        serializer = TitleSerializer(instance, data=item,
+                                     partial=instance is not None)
+        if serializer.is_valid():
+            valid.append((instance, serializer.validated_data))
+            errors.append(None)
+        else:
+            valid.append(None)
+            errors.append(serializer.errors)
+    return valid, errors
+
+
+def save_new_titles(titles):
+    if connection.features.can_return_rows_from_bulk_insert:
+        return Title.objects.bulk_create(titles)
+    for title in titles:
+        title.save()
+    return titles
+
+
+def sync_genres(desired):
+    """Приводит жанры произведений к ``desired`` (``{title_id:
+    множество genre_id}``) одной вставкой и одним удалением."""
+    if not desired:
+        return
+    existing = {}
+    remove_ids = []
+    links = TitleGenre.objects.filter(
+        title_id__in=desired
+    ).values_list('id', 'title_id', 'genre_id')
+    for link_id, title_id, genre_id in links:
+        existing.setdefault(title_id, set()).add(genre_id)
+        if genre_id not in desired[title_id]:
+            remove_ids.append(link_id)
+    TitleGenre.objects.bulk_create([
+        TitleGenre(title_id=title_id, genre_id=genre_id)
+        for title_id, genre_ids in desired.items()
+        for genre_id in genre_ids - existing.get(title_id, set())
+    ])
+    if remove_ids:
+        TitleGenre.objects.filter(id__in=remove_ids).delete()
+
+
+@transaction.atomic
+def save_titles(valid):
+    """Сохраняет проверенные произведения: новые — через
+    ``bulk_create``, изменённые — одним ``bulk_update``; оценки
+    изменённых произведений переносятся в новые разрезы сводной
+    таблицы. Возвращает список ``(title, created)`` той же длины,
+    что и ``valid``."""
+    saved, created, updated, update_fields = [], [], [], set()
+    genres = {}
+    for entry in valid:
+        if entry is None:
+            saved.append(None)
+            continue
+        instance, data = entry
+        data = dict(data)
+        genre = data.pop('genre', None)
+        if instance is None:
+            instance = Title(**data)
+            created.append(instance)
+        else:
+            for field, value in data.items():
+                setattr(instance, field, value)
+            update_fields.update(data)
+            updated.append(instance)
+        saved.append((instance, entry[0] is None))
+        if genre is not None:
+            genres[id(instance)] = (instance, {g.pk for g in genre})
+    save_new_titles(created)
+    before = title_dimensions([title.pk for title in updated])
+    if updated and update_fields:
+        now = timezone.now()
+        for instance in updated:
+            instance.updated_at = now
+        Title.objects.bulk_update(updated, {*update_fields, 'updated_at'})
+    sync_genres({
+        title.pk: genre_ids for title, genre_ids in genres.values()
+    })
+    move_titles(before, title_dimensions(before))
+    title_changed(*(title.pk for title in created + updated))
+    return saved
+
+
+def bulk_save_titles(items):
+    """Создаёт и обновляет произведения пачкой. Ошибки возвращаются
+    по каждому элементу, корректные элементы сохраняются."""
+    valid, errors = validate_titles(items)
+    return [
+        {'errors': error} if entry is None
+        else {'id': entry[0].pk, 'created': entry[1]}
+        for entry, error in zip(save_titles(valid), errors)
+    ]
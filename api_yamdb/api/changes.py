@@ -0,0 +1,91 @@
+import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from reviews.models import Change
+
+from .readers import ValuesReader, pub_date_field
+
+CURSOR_SALT = 'api.changes'
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = ('Курсор устарел: изменения после него уже удалены '
+                      'из журнала, нужна полная синхронизация.')
+    default_code = 'cursor_expired'
+
+
+class ChangeValuesReader(ValuesReader):
+    fields = {
+        'resource': 'resource',
+        'action': 'action',
+        'id': 'object_id',
+        'title_id': 'title_id',
+        'review_id': 'review_id',
+        'changed_at': 'changed_at',
+    }
+    converters = {'changed_at': pub_date_field.to_representation}
+
+    def represent(self, row, fields=None):
+        return {
+            name: value for name, value in super().represent(row).items()
+            if value is not None
+        }
+
+
+def make_cursor(after_id):
+    return signing.dumps(after_id, salt=CURSOR_SALT, compress=True)
+
+
+def read_cursor(cursor):
+    """Возвращает id последнего отданного изменения. Курсор старше
+    срока хранения журнала мог пропустить удалённые записи."""
+    if not cursor:
+        return 0
+    try:
+        return int(signing.loads(
+            cursor, salt=CURSOR_SALT,
+            max_age=datetime.timedelta(days=settings.CHANGES_RETENTION_DAYS)
+        ))
+    except signing.SignatureExpired:
+        raise CursorExpired()
+    except (signing.BadSignature, TypeError, ValueError):
+        raise ValidationError({'cursor': ['Некорректный курсор.']})
+
+
+def read_changes(cursor=None, limit=None):
+    """Пачка изменений после курсора в порядке записи.
+
+    Возвращаются только записи старше ``CHANGES_SETTLE_SECONDS``:
+    id выдаются при вставке, и транзакция с меньшим id может
+    зафиксироваться позже соседней. Повторы одного объекта внутри
+    пачки схлопываются в последнее изменение, курсор при этом
+    продвигается за всю пачку.
+    """
+    limit = limit or settings.CHANGES_BATCH_SIZE
+    after_id = read_cursor(cursor)
+    settled = timezone.now() - datetime.timedelta(
+        seconds=settings.CHANGES_SETTLE_SECONDS
+    )
+    reader = ChangeValuesReader()
+    rows = list(Change.objects.filter(
+        id__gt=after_id, changed_at__lte=settled
+    ).values('id', *reader.lookups(reader.select()))[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        after_id = rows[-1]['id']
+    latest = {}
+    for row in rows:
+        key = (row['resource'], row['object_id'])
+        latest.pop(key, None)
+        latest[key] = row
+    return {
+        'changes': reader.represent_many(latest.values()),
+        'next_cursor': make_cursor(after_id),
+        'has_more': has_more,
+    }
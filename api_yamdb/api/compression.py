@@ -0,0 +1,83 @@
+import gzip
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/msgpack',
+    'application/x-ndjson',
+    'application/javascript',
+)
+
+
+def gzip_compress(data, level=None):
+    return gzip.compress(data, compresslevel=level or settings.GZIP_LEVEL,
+                         mtime=0)
+
+
+def gzip_stream(chunks, level=None):
+    compressor = zlib.compressobj(level or settings.GZIP_LEVEL,
+                                  zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def brotli_compress(data, quality=None):
+    return brotli.compress(data, quality=quality or settings.BROTLI_QUALITY)
+
+
+def brotli_stream(chunks, quality=None):
+    compressor = brotli.Compressor(
+        quality=quality or settings.BROTLI_QUALITY
+    )
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+CODECS = {'gzip': (gzip_compress, gzip_stream)}
+if brotli is not None:
+    CODECS['br'] = (brotli_compress, brotli_stream)
+
+
+def accepted_encodings(header):
+    """Кодировки из ``Accept-Encoding`` с ненулевым весом."""
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(header):
+    """Выбирает brotli, если он доступен и принимается клиентом,
+    иначе gzip. Возвращает ``None``, если сжимать нечем."""
+    accepted = accepted_encodings(header)
+    for encoding in ('br', 'gzip'):
+        if encoding in CODECS and (encoding in accepted or '*' in accepted):
+            return encoding
+    return None
+
+
+def is_compressible(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
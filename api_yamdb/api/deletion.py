@@ -0,0 +1,181 @@
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from reviews.models import (Category, Comment, DeletionTask, Review, Title,
+                            TitleGenre)
+from reviews.rollups import move_titles, title_dimensions
+from users.models import User
+
+from .feed import activity_feed
+from .moderation import (comments_deleted, purge_comments, purge_reviews,
+                         raw_delete, reviews_deleted)
+from .signals import title_changed
+
+logger = logging.getLogger(__name__)
+
+Target = DeletionTask.TargetChoices
+Status = DeletionTask.StatusChoices
+
+
+def delete_comments_chunk(rows):
+    purge_comments([pk for pk, *_ in rows])
+    reviews = {(review_id, title_id) for _, review_id, title_id in rows}
+    transaction.on_commit(lambda: comments_deleted(reviews))
+
+
+def delete_reviews_chunk(rows):
+    review_ids = [pk for pk, _ in rows]
+    title_ids = {title_id for _, title_id in rows}
+    purge_reviews(review_ids)
+    transaction.on_commit(lambda: reviews_deleted(title_ids, review_ids))
+
+
+def delete_links_chunk(rows):
+    raw_delete(TitleGenre.objects.filter(id__in=[pk for pk, in rows]))
+
+
+def detach_titles_chunk(rows):
+    title_ids = [pk for pk, in rows]
+    before = title_dimensions(title_ids)
+    Title.objects.filter(id__in=title_ids).update(
+        category=None, updated_at=timezone.now()
+    )
+    move_titles(before, title_dimensions(title_ids))
+    transaction.on_commit(lambda: title_changed(*title_ids))
+
+
+COMMENTS = (('id', 'review_id', 'review__title_id'), delete_comments_chunk)
+REVIEWS = (('id', 'title_id'), delete_reviews_chunk)
+
+STEPS = {
+    Target.TITLE: lambda pk: [
+        (Comment.objects.filter(review__title_id=pk), *COMMENTS),
+        (Review.objects.filter(title_id=pk), *REVIEWS),
+        (TitleGenre.objects.filter(title_id=pk), ('id',), delete_links_chunk),
+    ],
+    Target.USER: lambda pk: [
+        (Comment.objects.filter(author_id=pk), *COMMENTS),
+        (Review.objects.filter(author_id=pk), *REVIEWS),
+    ],
+    Target.CATEGORY: lambda pk: [
+        (Title.objects.filter(category_id=pk), ('id',), detach_titles_chunk),
+    ],
+}
+
+MODELS = {
+    Target.TITLE: Title,
+    Target.USER: User,
+    Target.CATEGORY: Category,
+}
+
+
+def hide(target, instance):
+    """Скрывает объект из API до окончания удаления. Кэши
+    сбрасываются после фиксации: обработчики сохранения откладывают
+    сброс до неё."""
+    if target == Target.USER:
+        instance.is_active = False
+        instance.save(update_fields=['is_active'])
+        transaction.on_commit(activity_feed.invalidate)
+    else:
+        instance.is_hidden = True
+        instance.save(update_fields=['is_hidden'])
+
+
+def being_deleted(target):
+    """id объектов ``target``, удаление которых ещё не закончено."""
+    return DeletionTask.objects.filter(
+        target=target, status__in=(Status.PENDING, Status.RUNNING)
+    ).values('object_id')
+
+
+def schedule_deletion(target, instance):
+    """Скрывает объект и ставит его удаление в очередь фонового
+    обработчика. Возвращает созданную задачу."""
+    with transaction.atomic():
+        hide(target, instance)
+        task = DeletionTask.objects.create(target=target,
+                                           object_id=instance.pk)
+        transaction.on_commit(lambda: worker.submit(task.pk))
+    return task
+
+
+def run_step(task, queryset, columns, handler, chunk_size):
+    """Обрабатывает зависимые записи пачками по ``chunk_size``,
+    каждую пачку — в отдельной транзакции."""
+    queryset = queryset.order_by().values_list(*columns)
+    while True:
+        with transaction.atomic():
+            rows = list(queryset[:chunk_size])
+            if not rows:
+                return
+            handler(rows)
+            task.processed += len(rows)
+            task.save(update_fields=['processed'])
+
+
+def run_deletion(task, chunk_size=None):
+    chunk_size = chunk_size or settings.DELETION_CHUNK_SIZE
+    task.status = Status.RUNNING
+    task.save(update_fields=['status'])
+    try:
+        for queryset, columns, handler in STEPS[task.target](task.object_id):
+            run_step(task, queryset, columns, handler, chunk_size)
+        MODELS[task.target].objects.filter(pk=task.object_id).delete()
+    except Exception as error:
+        logger.exception('Deletion task %s failed', task.pk)
+        task.status = Status.FAILED
+        task.error = str(error)
+    else:
+        task.status = Status.DONE
+    task.finished = timezone.now()
+    task.save(update_fields=['status', 'error', 'finished'])
+    return task
+
+
+class DeletionWorker:
+    """Фоновый поток, выполняющий задачи удаления по очереди.
+
+    Поток запускается при первой задаче. Незавершённые после
+    перезапуска задачи дорабатывает команда ``run_deletions``.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, task_pk):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='deletion-worker', daemon=True
+                )
+                self._thread.start()
+        self._queue.put(task_pk)
+
+    def join(self):
+        """Ждёт выполнения всех поставленных задач."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            task_pk = self._queue.get()
+            try:
+                task = DeletionTask.objects.filter(
+                    pk=task_pk, status=Status.PENDING
+                ).first()
+                if task is not None:
+                    run_deletion(task)
+            except Exception:
+                logger.exception('Deletion worker failed on %s', task_pk)
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+
+worker = DeletionWorker()
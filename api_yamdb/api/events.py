@@ -0,0 +1,118 @@
+import asyncio
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from reviews.models import Title
+
+from .broker import broker
+from .renderers import FastJSONRenderer
+
+EVENTS_PATH = re.compile(r'^/api/v1/titles/(?P<title_id>\d+)/events/$')
+
+renderer = FastJSONRenderer()
+
+
+def title_channel(title_id):
+    return f'title:{title_id}'
+
+
+def publish_event(event):
+    """Отправляет событие ленты подписчикам произведения."""
+    broker.publish(
+        title_channel(event['title']['id']),
+        b'event: %s\ndata: %s\n\n' % (event['type'].encode(),
+                                      renderer.render(event))
+    )
+
+
+def title_exists(title_id):
+    try:
+        return Title.objects.filter(pk=title_id, is_hidden=False).exists()
+    finally:
+        close_old_connections()
+
+
+async def send_json(send, status, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def stream_events(subscription, receive, send):
+    """Пересылает сообщения подписки клиенту, пока тот не
+    отключится; в тишине шлёт комментарий-пульс, чтобы прокси
+    не закрывали соединение."""
+    disconnect = asyncio.ensure_future(wait_disconnect(receive))
+    try:
+        while True:
+            message = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait(
+                {message, disconnect}, timeout=settings.EVENTS_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnect in done:
+                message.cancel()
+                return
+            if message in done:
+                body = message.result()
+            else:
+                message.cancel()
+                body = b': ping\n\n'
+            await send({'type': 'http.response.body', 'body': body,
+                        'more_body': True})
+    finally:
+        disconnect.cancel()
+
+
+async def title_events(scope, receive, send, title_id):
+    """Server-Sent Events о новых отзывах и комментариях
+    произведения."""
+    if scope['method'] != 'GET':
+        await send_json(send, 405, b'{"detail":"Method not allowed."}')
+        return
+    if not await sync_to_async(title_exists)(title_id):
+        await send_json(send, 404, b'{"detail":"Not found."}')
+        return
+    subscription = broker.subscribe(title_channel(title_id))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'retry: %d\n\n' % settings.EVENTS_RETRY_MS,
+            'more_body': True,
+        })
+        await stream_events(subscription, receive, send)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def route_events(application):
+    """Обслуживает потоки событий произведений в обход Django,
+    остальные запросы передаёт ``application``."""
+    async def router(scope, receive, send):
+        match = (EVENTS_PATH.match(scope['path'])
+                 if scope['type'] == 'http' else None)
+        if match is None:
+            await application(scope, receive, send)
+        else:
+            await title_events(scope, receive, send,
+                               int(match.group('title_id')))
+    return router
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from reviews.models import Comment, Review
+
+from .readers import CommentValuesReader, ReviewValuesReader
+
+EXPANSIONS = ('reviews',)
+
+review_reader = ReviewValuesReader()
+comment_reader = CommentValuesReader()
+
+
+def newest_review_ids(title_id):
+    return list(Review.objects.filter(title_id=title_id).order_by(
+        '-pub_date', '-id'
+    ).values_list('id', flat=True)[:settings.EXPAND_REVIEWS])
+
+
+def first_comments(review_ids):
+    """Первые ``EXPAND_COMMENTS`` комментариев каждого отзыва
+    в порядке списка комментариев одним запросом: коррелированный
+    подзапрос с ``LIMIT`` отбирает id для каждого отзыва."""
+    firsts = Comment.objects.filter(
+        review_id=OuterRef('review_id')
+    ).order_by('-pub_date', '-id').values('id')[:settings.EXPAND_COMMENTS]
+    rows = Comment.objects.filter(
+        review_id__in=review_ids, id__in=Subquery(firsts)
+    ).order_by('-pub_date', '-id').values(
+        'review_id', *comment_reader.lookups(comment_reader.select())
+    )
+    comments = {review_id: [] for review_id in review_ids}
+    for row in rows:
+        comments[row['review_id']].append(comment_reader.represent(row))
+    return comments
+
+
+def expand_reviews(review_ids):
+    """Отзывы ``review_ids`` в форме ``ReviewSerializer`` с числом
+    комментариев и первыми комментариями: два запроса при любом
+    числе отзывов."""
+    if not review_ids:
+        return []
+    rows = review_reader.prepare(
+        Review.objects.filter(id__in=review_ids).order_by('-pub_date', '-id')
+    )
+    comments = first_comments(review_ids)
+    return [
+        {**review_reader.represent(row), 'comments': comments[row['id']]}
+        for row in rows
+    ]
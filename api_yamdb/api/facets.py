@@ -0,0 +1,66 @@
+from hashlib import blake2b
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from reviews.models import TitleGenre
+
+from .filters import TitleFilter
+from .readers import represent_category, represent_genre
+from .versions import versions
+
+TEXT_FILTERS = ('name',)
+
+
+def labelled(counts, represent):
+    facets = []
+    for key, count in counts.items():
+        label = represent(key)
+        if label is not None:
+            facets.append({**label, 'count': count})
+    return sorted(facets, key=lambda item: -item['count'])
+
+
+def count_facets(queryset):
+    """Счётчики по жанрам, категориям и годам для отфильтрованных
+    произведений: один сгруппированный запрос по связям с жанрами
+    и один по категории и году."""
+    queryset = queryset.order_by()
+    genres = dict(TitleGenre.objects.filter(
+        title_id__in=queryset.values('pk')
+    ).order_by().values_list('genre_id').annotate(count=Count('id')))
+    categories, years = {}, {}
+    rows = queryset.values_list('category_id', 'year').annotate(
+        count=Count('id')
+    )
+    for category_id, year, count in rows:
+        if category_id is not None:
+            categories[category_id] = categories.get(category_id, 0) + count
+        years[year] = years.get(year, 0) + count
+    return {
+        'genre': labelled(genres, represent_genre),
+        'category': labelled(categories, represent_category),
+        'year': [{'year': year, 'count': count}
+                 for year, count in sorted(years.items(), reverse=True)],
+    }
+
+
+def title_facets(queryset, params):
+    """Фасеты без текстового поиска берутся из кэша; ключ включает
+    значения фильтров и версии произведений и каталога."""
+    if any(params.get(name) for name in TEXT_FILTERS):
+        return count_facets(queryset)
+    filters = sorted(
+        (name, params.get(name)) for name in TitleFilter.base_filters
+        if name not in TEXT_FILTERS and params.get(name)
+    )
+    state = '|'.join(
+        token for token, _ in versions.get_many([('facets',), ('catalogue',)])
+    )
+    digest = blake2b(f'{state}|{filters}'.encode(), digest_size=12)
+    key = f'api:facets:{digest.hexdigest()}'
+    facets = cache.get(key)
+    if facets is None:
+        facets = count_facets(queryset)
+        cache.set(key, facets, settings.FACETS_CACHE_TIMEOUT)
+    return facets
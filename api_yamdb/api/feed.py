@@ -0,0 +1,130 @@
+import threading
+from collections import deque
+from itertools import islice
+from operator import itemgetter
+
+from django.conf import settings
+from reviews.models import Comment, Review
+
+from .readers import pub_date_field
+from .renderers import FastJSONRenderer
+from .versions import versions
+
+FEED_RESOURCE = ('activity',)
+
+
+def represent_review(row):
+    return {
+        'type': 'review',
+        'id': row['id'],
+        'title': {'id': row['title_id'], 'name': row['title__name']},
+        'author': row['author__username'],
+        'text': row['text'],
+        'score': row['score'],
+        'pub_date': pub_date_field.to_representation(row['pub_date']),
+    }
+
+
+def represent_comment(row):
+    return {
+        'type': 'comment',
+        'id': row['id'],
+        'review': row['review_id'],
+        'title': {'id': row['review__title_id'],
+                  'name': row['review__title__name']},
+        'author': row['author__username'],
+        'text': row['text'],
+        'pub_date': pub_date_field.to_representation(row['pub_date']),
+    }
+
+
+def review_event(review):
+    return represent_review({
+        'id': review.pk,
+        'title_id': review.title_id,
+        'title__name': review.title.name,
+        'author__username': review.author.username,
+        'text': review.text,
+        'score': review.score,
+        'pub_date': review.pub_date,
+    })
+
+
+def comment_event(comment):
+    return represent_comment({
+        'id': comment.pk,
+        'review_id': comment.review_id,
+        'review__title_id': comment.review.title_id,
+        'review__title__name': comment.review.title.name,
+        'author__username': comment.author.username,
+        'text': comment.text,
+        'pub_date': comment.pub_date,
+    })
+
+
+class ActivityFeed:
+    """Кольцо последних отзывов и комментариев в виде готового JSON.
+
+    Кольцо хранится в памяти процесса и пополняется при создании
+    отзывов и комментариев. Версия ленты в общем кэше говорит,
+    что кольцо устарело (удаления, записи из других процессов);
+    тогда оно один раз собирается заново двумя запросами.
+    """
+    renderer = FastJSONRenderer()
+
+    def __init__(self):
+        self._events = deque()
+        self._version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current_version():
+        return versions.get_many([FEED_RESOURCE])[0][0]
+
+    def rebuild(self, version):
+        size = settings.ACTIVITY_FEED_SIZE
+        reviews = Review.objects.filter(
+            title__is_hidden=False, author__is_active=True
+        ).order_by('-pub_date', '-id').values(
+            'id', 'title_id', 'title__name', 'author__username', 'text',
+            'score', 'pub_date'
+        )[:size]
+        comments = Comment.objects.filter(
+            review__title__is_hidden=False, author__is_active=True
+        ).order_by('-pub_date', '-id').values(
+            'id', 'review_id', 'review__title_id', 'review__title__name',
+            'author__username', 'text', 'pub_date'
+        )[:size]
+        rows = sorted(
+            [(row['pub_date'], represent_review(row)) for row in reviews]
+            + [(row['pub_date'], represent_comment(row)) for row in comments],
+            key=itemgetter(0), reverse=True
+        )[:size]
+        self._events = deque(
+            (self.renderer.render(event) for _, event in rows), maxlen=size
+        )
+        self._version = version
+
+    def events(self, limit):
+        version = self.current_version()
+        with self._lock:
+            if version != self._version:
+                self.rebuild(version)
+            return list(islice(self._events, limit))
+
+    def push(self, event):
+        """Добавляет событие, если кольцо было актуальным; иначе
+        его пересоберёт следующее чтение."""
+        with self._lock:
+            in_sync = self._version == self.current_version()
+            versions.bump(FEED_RESOURCE)
+            if in_sync:
+                self._events.appendleft(self.renderer.render(event))
+                self._version = self.current_version()
+
+    @staticmethod
+    def invalidate():
+        versions.bump(FEED_RESOURCE)
+
+
+activity_feed = ActivityFeed()
@@ -0,0 +1,26 @@
+from rest_framework.exceptions import ValidationError
+
+
+def split_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def sparse_fields(request, available):
+    """Возвращает поля ответа, выбранные параметрами ``?fields=``
+    и ``?omit=``, в порядке ``available``. Без этих параметров
+    возвращает ``None``."""
+    fields = request.query_params.get('fields')
+    omit = request.query_params.get('omit')
+    if not fields and not omit:
+        return None
+    selected = split_names(fields) if fields else list(available)
+    omitted = split_names(omit) if omit else []
+    unknown = set(selected + omitted) - set(available)
+    if unknown:
+        raise ValidationError({
+            'fields': [f'Неизвестные поля: {", ".join(sorted(unknown))}.']
+        })
+    return tuple(
+        name for name in available
+        if name in selected and name not in omitted
+    )
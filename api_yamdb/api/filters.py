@@ -1,12 +1,58 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
-from reviews.models import Title
+from reviews.catalogue import catalogue
+from reviews.models import Title, TitleGenre
+
+from .fieldsets import split_names
+
+
+def genre_exists(genre_ids):
+    """Полусоединение с ``TitleGenre`` вместо JOIN: строки
+    произведений не размножаются и не требуют ``DISTINCT``."""
+    return Exists(TitleGenre.objects.filter(
+        title_id=OuterRef('pk'), genre_id__in=genre_ids
+    ))
 
 
 class TitleFilter(filters.FilterSet):
     name = filters.CharFilter(lookup_expr='icontains')
-    genre = filters.CharFilter(lookup_expr='slug')
-    category = filters.CharFilter(lookup_expr='slug')
+    genre = filters.CharFilter(method='filter_genre')
+    genre_match = filters.ChoiceFilter(
+        choices=(('any', 'any'), ('all', 'all')),
+        method='filter_genre_match'
+    )
+    category = filters.CharFilter(method='filter_category')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
 
     class Meta:
         model = Title
         fields = ['genre', 'category', 'name', 'year']
+
+    def filter_genre(self, queryset, name, value):
+        """``genre=a,b`` — произведения хотя бы с одним из жанров,
+        с ``genre_match=all`` — со всеми сразу."""
+        genres = [catalogue.genre_by_slug(slug) for slug in split_names(value)]
+        if self.form.cleaned_data.get('genre_match') == 'all':
+            if None in genres:
+                return queryset.none()
+            return queryset.filter(
+                *(genre_exists([genre.pk]) for genre in genres)
+            )
+        genre_ids = [genre.pk for genre in genres if genre is not None]
+        if not genre_ids:
+            return queryset.none()
+        return queryset.filter(genre_exists(genre_ids))
+
+    def filter_genre_match(self, queryset, name, value):
+        return queryset
+
+    def filter_category(self, queryset, name, value):
+        category_ids = [
+            category.pk for category in map(catalogue.category_by_slug,
+                                            split_names(value))
+            if category is not None
+        ]
+        if not category_ids:
+            return queryset.none()
+        return queryset.filter(category_id__in=category_ids)
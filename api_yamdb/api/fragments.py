@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from reviews.catalogue import catalogue
+from reviews.models import Title
+
+from .readers import TitleValuesReader
+from .renderers import FastJSONRenderer
+
+FRAGMENT_KEY_PREFIX = 'api:title-fragment'
+
+
+class TitleFragmentStore:
+    """Хранилище готовых JSON-фрагментов произведений.
+
+    Фрагмент — это отрисованное в JSON представление одного
+    произведения в форме ``TitleListSerializer``. Ключ фрагмента
+    включает версию каталога, поэтому изменение жанра или категории
+    делает устаревшими сразу все фрагменты; изменения произведения,
+    его жанров и отзывов сбрасывают фрагмент конкретного произведения.
+    """
+    renderer = FastJSONRenderer()
+    reader = TitleValuesReader()
+
+    @staticmethod
+    def get_queryset():
+        return Title.objects.filter(is_hidden=False)
+
+    @staticmethod
+    def make_key(pk, version):
+        return f'{FRAGMENT_KEY_PREFIX}:{version}:{pk}'
+
+    def render(self, titles):
+        """Возвращает словарь ``{pk: фрагмент}`` для переданных
+        произведений."""
+        return {
+            data['id']: self.renderer.render(data)
+            for data in self.reader.represent_many(self.reader.prepare(titles))
+        }
+
+    def get_many(self, pks):
+        """Возвращает фрагменты в порядке ``pks``, дорисовывая
+        отсутствующие. Несуществующие произведения пропускаются."""
+        version = catalogue.current_version()
+        keys = {pk: self.make_key(pk, version) for pk in pks}
+        cached = cache.get_many(keys.values())
+        fragments = {
+            pk: cached[key] for pk, key in keys.items() if key in cached
+        }
+        missing = [pk for pk in pks if pk not in fragments]
+        if missing:
+            rendered = self.render(self.get_queryset().filter(pk__in=missing))
+            cache.set_many(
+                {keys[pk]: fragment for pk, fragment in rendered.items()},
+                None
+            )
+            fragments.update(rendered)
+        return [fragments[pk] for pk in pks if pk in fragments]
+
+    def get(self, pk):
+        fragments = self.get_many([pk])
+        return fragments[0] if fragments else None
+
+    def peek(self, pk):
+        """Возвращает сохранённый фрагмент без дорисовки."""
+        return cache.get(self.make_key(pk, catalogue.current_version()))
+
+    def store(self, fragments):
+        version = catalogue.current_version()
+        cache.set_many(
+            {self.make_key(pk, version): fragment
+             for pk, fragment in fragments.items()},
+            None
+        )
+
+    def invalidate(self, *pks):
+        version = catalogue.current_version()
+        cache.delete_many([self.make_key(pk, version) for pk in pks])
+
+
+fragment_store = TitleFragmentStore()
@@ -0,0 +1,309 @@
+import asyncio
+import datetime
+import random
+import time
+import timeit
+from decimal import Decimal
+from io import BytesIO
+
+from api.async_reads import PooledReads
+from api.compression import brotli, brotli_compress, gzip_compress
+from api.filters import genre_exists
+from api.parsers import FastJSONParser, MessagePackParser
+from api.renderers import FastJSONRenderer, MessagePackRenderer
+from django.core.asgi import get_asgi_application
+from django.core.management import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import DateTimeField
+from reviews.models import Category, Genre, Title, TitleGenre
+
+pub_date_field = DateTimeField()
+
+WORDS = (
+    'фильм книга сюжет герой автор режиссёр музыка финал история мир '
+    'время жизнь любовь война дорога город море ночь свет тьма смысл '
+    'интересно скучно сильно слабо неожиданно красиво долго быстро'
+).split()
+
+
+def sample_text(seed, words):
+    rnd = random.Random(seed)
+    return ' '.join(rnd.choice(WORDS) for _ in range(words))
+
+
+def title_page(items):
+    """Страница в форме ``TitleListSerializer``."""
+    return {
+        'count': items * 20,
+        'next': 'http://localhost/api/v1/titles/?page=2',
+        'previous': None,
+        'results': [{
+            'id': pk,
+            'name': f'Произведение {pk}',
+            'year': 1950 + pk % 70,
+            'rating': pk % 10 + 1,
+            'reviews_count': pk % 40,
+            'description': sample_text(pk, 60),
+            'genre': [
+                {'name': 'Драма', 'slug': 'drama'},
+                {'name': 'Комедия', 'slug': 'comedy'},
+            ],
+            'category': {'name': 'Фильм', 'slug': 'movie'},
+        } for pk in range(1, items + 1)],
+    }
+
+
+def review_page(items, raw_dates=False):
+    """Страница в форме ``ReviewSerializer``. С ``raw_dates`` даты
+    и оценки остаются объектами Python и кодируются рендерером."""
+    now = timezone.now()
+    results = []
+    for pk in range(1, items + 1):
+        pub_date = now - datetime.timedelta(minutes=pk)
+        results.append({
+            'id': pk,
+            'author': f'user{pk}',
+            'text': sample_text(pk, 40),
+            'pub_date': (pub_date if raw_dates
+                         else pub_date_field.to_representation(pub_date)),
+            'score': Decimal(pk % 10 + 1) if raw_dates else pk % 10 + 1,
+            'comments_count': pk % 7,
+        })
+    return {
+        'count': items * 20,
+        'next': 'http://localhost/api/v1/titles/1/reviews/?page=2',
+        'previous': None,
+        'results': results,
+    }
+
+
+PAGES = {
+    'titles': title_page,
+    'reviews': review_page,
+    'reviews-raw': lambda items: review_page(items, raw_dates=True),
+}
+
+
+class Command(BaseCommand):
+    help = 'Measuring API encoding costs on synthetic titles/reviews pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'suite',
+            choices=['json', 'msgpack', 'compression', 'filters', 'asgi'],
+            help="benchmark suite to run"
+        )
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=100,
+            help="number of objects on a page (titles in the catalogue "
+                 "for the filters suite)"
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=200,
+            help="number of timed iterations (requests for the asgi suite)"
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=32,
+            help="concurrent clients for the asgi suite"
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=20,
+            help="delay in ms added to every database query "
+                 "for the asgi suite"
+        )
+
+    def timed(self, func, repeat):
+        """Среднее время одного вызова в микросекундах."""
+        return timeit.timeit(func, number=repeat) / repeat * 1e6
+
+    def report(self, page, name, seconds, size, unit='B'):
+        self.stdout.write(
+            f'{page:<12} {name:<16} {seconds:>10.1f} us {size:>10} {unit}'
+        )
+
+    def bench_coders(self, coders, options):
+        for page_name, make_page in PAGES.items():
+            page = make_page(options['items'])
+            for name, (renderer, parser) in coders.items():
+                body = renderer.render(page)
+                self.report(
+                    page_name, f'{name} render',
+                    self.timed(lambda: renderer.render(page),
+                               options['repeat']),
+                    len(body)
+                )
+                self.report(
+                    page_name, f'{name} parse',
+                    self.timed(lambda: parser.parse(BytesIO(body)),
+                               options['repeat']),
+                    len(body)
+                )
+
+    def bench_json(self, options):
+        self.bench_coders({
+            'stdlib': (JSONRenderer(), JSONParser()),
+            'fast': (FastJSONRenderer(), FastJSONParser()),
+        }, options)
+
+    def bench_msgpack(self, options):
+        self.bench_coders({
+            'json': (FastJSONRenderer(), FastJSONParser()),
+            'msgpack': (MessagePackRenderer(), MessagePackParser()),
+        }, options)
+
+    def bench_compression(self, options):
+        codecs = {f'gzip-{level}': (gzip_compress, level)
+                  for level in (1, 6, 9)}
+        if brotli is not None:
+            codecs.update({f'br-{quality}': (brotli_compress, quality)
+                           for quality in (1, 5, 11)})
+        renderer = FastJSONRenderer()
+        for page_name, make_page in PAGES.items():
+            body = renderer.render(make_page(options['items']))
+            self.report(page_name, 'identity', 0, len(body))
+            for name, (compress, level) in codecs.items():
+                self.report(
+                    page_name, name,
+                    self.timed(lambda: compress(body, level),
+                               options['repeat']),
+                    len(compress(body, level))
+                )
+
+    def make_catalogue(self, items):
+        """Временный каталог: ``items`` произведений по три жанра."""
+        Genre.objects.bulk_create([
+            Genre(name=f'Жанр бенчмарка {n}', slug=f'benchmark-genre-{n}')
+            for n in range(10)
+        ])
+        genres = list(Genre.objects.filter(slug__startswith='benchmark-'))
+        category = Category.objects.create(name='Категория бенчмарка',
+                                           slug='benchmark-category')
+        Title.objects.bulk_create([
+            Title(name=f'Произведение {pk}', year=1950 + pk % 70,
+                  category=category)
+            for pk in range(items)
+        ])
+        titles = Title.objects.filter(category=category).values_list(
+            'pk', flat=True
+        )
+        TitleGenre.objects.bulk_create([
+            TitleGenre(title_id=pk,
+                       genre_id=genres[(n + shift) % len(genres)].pk)
+            for n, pk in enumerate(titles) for shift in (0, 1, 3)
+        ])
+        return [genre.pk for genre in genres[:3]]
+
+    def bench_filters(self, options):
+        """Фильтр по нескольким жанрам: JOIN с ``DISTINCT`` против
+        ``EXISTS``, подсчёт и первая страница."""
+        with transaction.atomic():
+            genre_ids = self.make_catalogue(options['items'])
+            titles = Title.objects.order_by('-id')
+            variants = {
+                'join any': titles.filter(
+                    genre__in=genre_ids).distinct(),
+                'exists any': titles.filter(genre_exists(genre_ids)),
+                'join all': titles.filter(genre=genre_ids[0]).filter(
+                    genre=genre_ids[1]).distinct(),
+                'exists all': titles.filter(genre_exists(genre_ids[:1]),
+                                            genre_exists(genre_ids[1:2])),
+            }
+            for name, queryset in variants.items():
+                self.report('count', name, self.timed(
+                    queryset.count, options['repeat']), queryset.count(),
+                    'rows')
+                self.report('page', name, self.timed(
+                    lambda: list(queryset[:5]), options['repeat']), 5,
+                    'rows')
+            transaction.set_rollback(True)
+
+    @staticmethod
+    async def request(application, path):
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        await application({
+            'type': 'http', 'method': 'GET', 'path': path,
+            'query_string': b'', 'headers': [], 'scheme': 'http',
+            'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+        }, receive, send)
+        return messages[0]['status']
+
+    async def load(self, application, path, options):
+        """``--repeat`` запросов от ``--concurrency`` клиентов.
+        Возвращает общее время и время каждого запроса."""
+        remaining = iter(range(options['repeat']))
+        latencies = []
+
+        async def client():
+            for _ in remaining:
+                started = time.perf_counter()
+                status = await self.request(application, path)
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    raise CommandError(f'{path}: status {status}')
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(client() for _ in range(options['concurrency']))
+        )
+        return time.perf_counter() - started, sorted(latencies)
+
+    def bench_asgi(self, options):
+        """Конкурентные чтения с задержкой каждого запроса к базе:
+        синхронные представления под ASGI Django против пула чтений.
+        Нужен каталог хотя бы с одним произведением."""
+        title = Title.objects.filter(is_hidden=False).first()
+        if title is None:
+            raise CommandError('No titles to read, load data first')
+        delay = options['latency'] / 1000
+
+        def slow_query(execute, sql, params, many, context):
+            time.sleep(delay)
+            return execute(sql, params, many, context)
+
+        def install(connection, **kwargs):
+            if slow_query not in connection.execute_wrappers:
+                connection.execute_wrappers.append(slow_query)
+
+        connection_created.connect(install)
+        for connection in connections.all():
+            install(connection)
+        django_application = get_asgi_application()
+        applications = {
+            'django': django_application,
+            'pooled': PooledReads(django_application),
+        }
+        for path in ('/api/v1/titles/', f'/api/v1/titles/{title.pk}/',
+                     f'/api/v1/titles/{title.pk}/reviews/'):
+            for name, application in applications.items():
+                elapsed, latencies = asyncio.run(
+                    self.load(application, path, options)
+                )
+                rate = f'{len(latencies) / elapsed:.1f}'
+                for percentile in (50, 99):
+                    index = min(len(latencies) - 1,
+                                len(latencies) * percentile // 100)
+                    self.report(path.split('/v1/')[1][:12],
+                                f'{name} p{percentile}',
+                                latencies[index] * 1e6, rate, 'rps')
+
+    def handle(self, *args, **options):
+        getattr(self, f'bench_{options["suite"]}')(options)
@@ -0,0 +1,45 @@
+from api.fragments import fragment_store
+from django.core.management import BaseCommand
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Checking stored title JSON fragments against fresh rendering'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help="replace stale fragments with fresh ones"
+        )
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            default=500,
+            help="number of titles rendered per query"
+        )
+
+    def handle(self, *args, **options):
+        pks = list(Title.objects.order_by('pk').values_list('pk', flat=True))
+        checked = stale = 0
+        for start in range(0, len(pks), options['chunk_size']):
+            chunk = pks[start:start + options['chunk_size']]
+            fresh = fragment_store.render(
+                fragment_store.get_queryset().filter(pk__in=chunk)
+            )
+            outdated = {}
+            for pk, fragment in fresh.items():
+                stored = fragment_store.peek(pk)
+                if stored is None:
+                    continue
+                checked += 1
+                if stored != fragment:
+                    outdated[pk] = fragment
+                    self.stdout.write(f'Stale fragment: title {pk}')
+            stale += len(outdated)
+            if options['fix'] and outdated:
+                fragment_store.store(outdated)
+        self.stdout.write(
+            f'Checked {checked} fragments, stale: {stale}'
+            + (', fixed' if options['fix'] and stale else '')
+        )
@@ -0,0 +1,25 @@
+from api.signals import rating_changed
+from api.versions import versions
+from django.core.management import BaseCommand
+from reviews.changes import Resource, record_changes
+from reviews.counters import reconcile_counters
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = 'Reconciling denormalized review and comment counters'
+
+    def handle(self, *args, **options):
+        fixed = reconcile_counters()
+        if fixed[Title]:
+            rating_changed(*fixed[Title])
+        reviews = list(Review.objects.filter(
+            pk__in=fixed[Review]
+        ).values_list('id', 'title_id'))
+        if reviews:
+            versions.bump(*{('reviews', title_id) for _, title_id in reviews})
+            record_changes(Resource.REVIEW, reviews)
+        self.stdout.write(
+            f'Fixed {len(fixed[Title])} title and '
+            f'{len(fixed[Review])} review counters'
+        )
@@ -0,0 +1,27 @@
+from api.deletion import run_deletion
+from django.core.management import BaseCommand
+from reviews.models import DeletionTask
+
+
+class Command(BaseCommand):
+    help = 'Running pending and interrupted background deletions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            default=None,
+            help="number of dependent rows removed per transaction"
+        )
+
+    def handle(self, *args, **options):
+        tasks = DeletionTask.objects.filter(status__in=(
+            DeletionTask.StatusChoices.PENDING,
+            DeletionTask.StatusChoices.RUNNING,
+        )).order_by('id')
+        for task in tasks:
+            run_deletion(task, options['chunk_size'])
+            self.stdout.write(
+                f'{task.target} {task.object_id}: {task.status}, '
+                f'processed {task.processed}'
+            )
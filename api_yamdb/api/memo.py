@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_memo = ContextVar('api_memo', default=None)
+
+
+@contextmanager
+def shared_memo():
+    """Общая мемоизация для всех подзапросов пакетного запроса."""
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+def memoize(key, func):
+    """Возвращает ``func()``, запомненный по ``key`` в пределах
+    ``shared_memo``. Вне его просто вызывает ``func``."""
+    memo = _memo.get()
+    if memo is None:
+        return func()
+    if key not in memo:
+        memo[key] = func()
+    return memo[key]
+
+
+def clear_memo():
+    memo = _memo.get()
+    if memo is not None:
+        memo.clear()
@@ -0,0 +1,84 @@
+import re
+from hashlib import blake2b
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .compression import CODECS, choose_encoding, is_compressible
+
+COMPRESSED_KEY_PREFIX = 'api:compressed'
+ETAG_SUFFIX_RE = re.compile(r'-(%s)"' % '|'.join(CODECS))
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает ответы gzip или brotli по ``Accept-Encoding``.
+
+    Обычные ответы сжимаются, только если они не меньше
+    ``COMPRESSION_MIN_SIZE`` байт, потоковые — по мере отдачи.
+    Для ответов с ``compressed_cache = True`` (собранных из кэша)
+    сжатые байты сохраняются в кэше по хешу содержимого, и повторная
+    отдача того же ответа не сжимает его заново.
+    """
+
+    def process_request(self, request):
+        """Убирает из ``If-Match``/``If-None-Match`` суффикс кодировки,
+        добавленный к ETag сжатого ответа, и запоминает его для 304."""
+        request.etag_encoding = None
+        for header in ('HTTP_IF_MATCH', 'HTTP_IF_NONE_MATCH'):
+            value = request.META.get(header)
+            match = value and ETAG_SUFFIX_RE.search(value)
+            if match:
+                request.etag_encoding = match.group(1)
+                request.META[header] = ETAG_SUFFIX_RE.sub('"', value)
+
+    def process_response(self, request, response):
+        if response.status_code == 304:
+            return self.suffix_etag(response,
+                                    getattr(request, 'etag_encoding', None))
+        if (response.has_header('Content-Encoding')
+                or not is_compressible(response.get('Content-Type', ''))):
+            return response
+        if (not response.streaming
+                and len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+        compress, stream = CODECS[encoding]
+        if response.streaming:
+            response.streaming_content = stream(response.streaming_content)
+            del response['Content-Length']
+        else:
+            content = self.compress(response, encoding, compress)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        return self.suffix_etag(response, encoding)
+
+    @staticmethod
+    def suffix_etag(response, encoding):
+        """Сжатое представление — другой набор байтов, поэтому
+        у сильного ETag появляется суффикс кодировки."""
+        etag = response.get('ETag')
+        if encoding and etag and not etag.startswith('W/'):
+            response['ETag'] = f'{etag[:-1]}-{encoding}"'
+        return response
+
+    @staticmethod
+    def compress(response, encoding, compress):
+        if not getattr(response, 'compressed_cache', False):
+            return compress(response.content)
+        digest = blake2b(response.content, digest_size=16).hexdigest()
+        key = f'{COMPRESSED_KEY_PREFIX}:{encoding}:{digest}'
+        content = cache.get(key)
+        if content is None:
+            content = compress(response.content)
+            cache.set(key, content, settings.COMPRESSED_CACHE_TIMEOUT)
+        return content
@@ -1,4 +1,21 @@
-from rest_framework import mixins, viewsets
+from hashlib import blake2b
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import mixins, status, viewsets
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .deletion import schedule_deletion
+from .fieldsets import sparse_fields
+from .permissions import IsMachineClient
+from .renderers import NDJSONRenderer
+from .serializers import DeletionTaskSerializer
+from .versions import versions
 
 
 class ListCreateDestroyViewSet(mixins.CreateModelMixin,
@@ -6,3 +23,155 @@ class ListCreateDestroyViewSet(mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
     pass
+
+
+class BackgroundDestroyMixin:
+    """С ``?background=true`` объект сразу скрывается, а он сам
+    и зависимые записи удаляются фоновым обработчиком пачками.
+    Ответ 202 содержит задачу, прогресс которой виден
+    администраторам."""
+    deletion_target = None
+
+    def destroy(self, request, *args, **kwargs):
+        if request.query_params.get('background') not in ('1', 'true'):
+            return super().destroy(request, *args, **kwargs)
+        task = schedule_deletion(self.deletion_target, self.get_object())
+        return Response(DeletionTaskSerializer(task).data,
+                        status=status.HTTP_202_ACCEPTED)
+
+
+class StreamingListMixin:
+    """Выгрузка всего списка построчным JSON без пагинации.
+
+    Включается заголовком ``Accept: application/x-ndjson`` или
+    ``?format=ndjson``. Строки читаются через ``iterator()``
+    (серверный курсор PostgreSQL) пачками по ``STREAM_CHUNK_SIZE``
+    и сразу отдаются клиенту, поэтому память не растёт с размером
+    списка. Это верно под WSGI и под ASGI через ``PooledReads``,
+    где тело ответа читается в потоке представления. Обработчик ASGI
+    самого Django перебирает тело в цикле событий, где запросы
+    к базе запрещены, поэтому там строки читаются заранее, ещё
+    в представлении, и выгрузка целиком занимает память.
+    Работает поверх ``values_reader`` из ``ValuesListMixin``.
+    """
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES,
+                        NDJSONRenderer]
+    stream_permission = IsMachineClient()
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != NDJSONRenderer.format:
+            return super().list(request, *args, **kwargs)
+        if not self.stream_permission.has_permission(request, self):
+            self.permission_denied(
+                request, message=self.stream_permission.message
+            )
+        fields = self.get_sparse_fields()
+        rows = self.values_reader.prepare(
+            self.filter_queryset(self.get_queryset()), fields
+        ).iterator(chunk_size=settings.STREAM_CHUNK_SIZE)
+        chunks = self.stream_rows(rows, fields)
+        if isinstance(request._request, ASGIRequest):
+            chunks = list(chunks)
+        return StreamingHttpResponse(chunks,
+                                     content_type=NDJSONRenderer.media_type)
+
+    def stream_rows(self, rows, fields):
+        render = NDJSONRenderer.renderer.render
+        chunk = []
+        for row in rows:
+            chunk.append(render(self.values_reader.represent(row, fields)))
+            if len(chunk) >= settings.STREAM_CHUNK_SIZE:
+                yield b'\n'.join(chunk) + b'\n'
+                chunk = []
+        if chunk:
+            yield b'\n'.join(chunk) + b'\n'
+
+
+class ValuesListMixin:
+    """Отдаёт список через ``values_reader`` без создания
+    сериализатора на каждый объект. Параметры ``?fields=``
+    и ``?omit=`` сужают и ответ, и выбираемые колонки."""
+    values_reader = None
+
+    def get_sparse_fields(self):
+        return sparse_fields(self.request, tuple(self.values_reader.fields))
+
+    def list(self, request, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        queryset = self.values_reader.prepare(
+            self.filter_queryset(self.get_queryset()), fields
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                self.values_reader.represent_many(page, fields)
+            )
+        return Response(self.values_reader.represent_many(queryset, fields))
+
+
+class ConditionalResponse(APIException):
+    """Готовый ответ 304/412, прерывающий обработку запроса."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalMixin:
+    """Валидаторы ETag и Last-Modified по счётчикам версий.
+
+    Для ``conditional_actions`` по заголовкам ``If-None-Match``
+    и ``If-Modified-Since`` возвращается 304 до выполнения запросов
+    к базе и сериализации. Изменение (PATCH/PUT) с устаревшим
+    ``If-Match`` получает 412. Ответ зависит от версии ресурса
+    ``version_resource`` с id из аргумента адреса ``version_kwarg``;
+    без него условные запросы не обрабатываются.
+    """
+    conditional_actions = ('list', 'retrieve')
+    validated_actions = ('update', 'partial_update')
+    version_resource = None
+    version_kwarg = 'pk'
+
+    def get_version_resources(self):
+        if self.version_resource is None:
+            return []
+        return [(self.version_resource, self.kwargs[self.version_kwarg])]
+
+    def get_validators(self):
+        resources = self.get_version_resources()
+        if not resources:
+            return None
+        tokens = versions.get_many(resources)
+        state = '|'.join(token for token, _ in tokens)
+        variant = (f'{self.request.get_full_path()}|'
+                   f'{self.request.accepted_media_type}')
+        etag = blake2b(f'{state}|{variant}'.encode(),
+                       digest_size=12).hexdigest()
+        return f'"{etag}"', int(max(changed for _, changed in tokens))
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if self.action in self.conditional_actions + self.validated_actions:
+            self.validators = self.get_validators()
+        if self.validators:
+            response = get_conditional_response(request, *self.validators)
+            if response is not None:
+                raise ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        validators = getattr(self, 'validators', None)
+        if validators and response.status_code in (200, 304):
+            if self.action in self.validated_actions:
+                validators = self.get_validators()
+            response['ETag'] = validators[0]
+            response['Last-Modified'] = http_date(validators[1])
+        return response
@@ -0,0 +1,104 @@
+from django.db import transaction
+from reviews.changes import Action, Resource, record_changes
+from reviews.models import Comment, Review, ReviewRollup
+from reviews.recommendations import mark_neighbours_stale
+from reviews.rollups import comments_removed, reviews_removed
+from reviews.stats import scores_removed
+
+from .feed import activity_feed
+from .signals import rating_changed
+from .versions import versions
+
+
+def filter_moderated(queryset, criteria, title_lookup):
+    if criteria.get('ids'):
+        queryset = queryset.filter(id__in=criteria['ids'])
+    if criteria.get('author'):
+        queryset = queryset.filter(author__username=criteria['author'])
+    if criteria.get('title'):
+        queryset = queryset.filter(**{title_lookup: criteria['title']})
+    if criteria.get('since'):
+        queryset = queryset.filter(pub_date__gte=criteria['since'])
+    if criteria.get('until'):
+        return queryset.filter(pub_date__lt=criteria['until'])
+    return queryset
+
+
+def raw_delete(queryset):
+    """Одно выражение DELETE без загрузки объектов и сигналов.
+    Зависимые данные и кэши вызывающий код обновляет сам."""
+    return queryset._raw_delete(queryset.db)
+
+
+def purge_comments(comment_ids):
+    """Удаляет комментарии ``comment_ids`` одним DELETE, поправив
+    сводные таблицы и записав удаления в журнал изменений."""
+    comments = Comment.objects.filter(id__in=comment_ids)
+    comments_removed(comments)
+    rows = list(comments.values_list('id', 'review__title_id', 'review_id'))
+    record_changes(Resource.COMMENT, rows, Action.DELETE)
+    record_changes(Resource.REVIEW, {
+        (review_id, title_id) for _, title_id, review_id in rows
+    })
+    return raw_delete(comments)
+
+
+def purge_reviews(review_ids):
+    """Удаляет отзывы вместе с комментариями и сводными строками.
+    Возвращает число удалённых отзывов и комментариев."""
+    comments = purge_comments(list(Comment.objects.filter(
+        review_id__in=review_ids
+    ).values_list('id', flat=True)))
+    reviews = Review.objects.filter(id__in=review_ids)
+    reviews_removed(reviews)
+    scores_removed(reviews)
+    record_changes(Resource.REVIEW, reviews.values_list('id', 'title_id'),
+                   Action.DELETE)
+    raw_delete(ReviewRollup.objects.filter(review_id__in=review_ids))
+    return raw_delete(reviews), comments
+
+
+@transaction.atomic
+def delete_reviews(criteria):
+    """Удаляет отзывы по критериям вместе с их комментариями."""
+    reviews = filter_moderated(Review.objects.all(), criteria, 'title_id')
+    affected = list(reviews.values_list('id', 'title_id'))
+    if not affected:
+        return {'reviews': 0, 'comments': 0}
+    review_ids = [review_id for review_id, _ in affected]
+    title_ids = {title_id for _, title_id in affected}
+    deleted, comments = purge_reviews(review_ids)
+    transaction.on_commit(lambda: reviews_deleted(title_ids, review_ids))
+    return {'reviews': deleted, 'comments': comments}
+
+
+def reviews_deleted(title_ids, review_ids):
+    mark_neighbours_stale(*title_ids)
+    rating_changed(*title_ids)
+    activity_feed.invalidate()
+    versions.bump(*(('reviews', pk) for pk in title_ids),
+                  *(('comments', pk) for pk in review_ids))
+
+
+@transaction.atomic
+def delete_comments(criteria):
+    """Удаляет комментарии по критериям. Критерии вычисляются один
+    раз: счётчики, журнал и DELETE касаются одних и тех же
+    комментариев, даже если подходящие появляются параллельно."""
+    rows = list(filter_moderated(
+        Comment.objects.all(), criteria, 'review__title_id'
+    ).values_list('id', 'review_id', 'review__title_id'))
+    if not rows:
+        return {'reviews': 0, 'comments': 0}
+    reviews = {(review_id, title_id) for _, review_id, title_id in rows}
+    deleted = purge_comments([pk for pk, *_ in rows])
+    transaction.on_commit(lambda: comments_deleted(reviews))
+    return {'reviews': 0, 'comments': deleted}
+
+
+def comments_deleted(reviews):
+    """``reviews`` — пары ``(review_id, title_id)``: у отзывов
+    изменилось и число комментариев."""
+    versions.bump(*(('comments', review_id) for review_id, _ in reviews),
+                  *{('reviews', title_id) for _, title_id in reviews})
+    activity_feed.invalidate()
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import permissions
 from users.models import User
 
@@ -9,6 +10,14 @@ class IsAdminOnly(permissions.BasePermission):
                      or request.user.role == User.RoleChoices.ADMIN))
 
 
+class IsAdminOrModerator(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return (request.user.is_authenticated
+                and (request.user.is_superuser
+                     or request.user.role in (User.RoleChoices.ADMIN,
+                                              User.RoleChoices.MODERATOR)))
+
+
 class IsAdminOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         return (request.method in permissions.SAFE_METHODS
@@ -25,3 +34,16 @@ class IsAdminAuthorModeratorOrReadOnly(permissions.BasePermission):
                 or request.user.role == User.RoleChoices.MODERATOR
                 or obj.author == request.user
                 )
+
+
+class IsMachineClient(permissions.BasePermission):
+    """Выгрузки для синхронизации доступны администраторам и учётным
+    записям машинных клиентов из группы ``MACHINE_CLIENTS_GROUP``."""
+    message = 'Доступно только машинным клиентам.'
+
+    def has_permission(self, request, view):
+        return (request.user.is_authenticated
+                and (request.user.is_superuser
+                     or request.user.role == User.RoleChoices.ADMIN
+                     or request.user.groups.filter(
+                         name=settings.MACHINE_CLIENTS_GROUP).exists()))
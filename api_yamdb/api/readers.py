@@ -0,0 +1,154 @@
+from django.db.models import Avg
+from rest_framework import serializers
+from reviews.catalogue import catalogue
+from reviews.models import TitleGenre
+
+pub_date_field = serializers.DateTimeField()
+
+
+class ValuesReader:
+    """Быстрое чтение списков без экземпляров сериализаторов.
+
+    Строки выбираются через ``values()`` только с колонками
+    запрошенных полей и превращаются в словари той же формы, что и у
+    соответствующего сериализатора. ``fields`` задаёт порядок полей
+    и колонку ``values()`` для каждого из них, ``converters`` —
+    преобразования непустых значений.
+    """
+    fields = {}
+    converters = {}
+
+    def select(self, fields=None):
+        return tuple(self.fields) if fields is None else fields
+
+    def lookups(self, fields):
+        return {
+            self.fields[name] for name in fields
+            if self.fields[name] is not None
+        }
+
+    def prepare(self, queryset, fields=None):
+        return queryset.prefetch_related(None).values(
+            *self.lookups(self.select(fields))
+        )
+
+    def represent(self, row, fields=None):
+        ret = {}
+        for name in self.select(fields):
+            value = row[self.fields[name]]
+            convert = self.converters.get(name)
+            if convert is not None and value is not None:
+                value = convert(value)
+            ret[name] = value
+        return ret
+
+    def represent_many(self, rows, fields=None):
+        return [self.represent(row, fields) for row in rows]
+
+
+class ReviewValuesReader(ValuesReader):
+    """Повторяет ``ReviewSerializer``."""
+    fields = {
+        'id': 'id',
+        'author': 'author__username',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'score': 'score',
+        'comments_count': 'comments_count',
+    }
+    converters = {'pub_date': pub_date_field.to_representation}
+
+
+class CommentValuesReader(ValuesReader):
+    """Повторяет ``CommentSerializer``."""
+    fields = {
+        'id': 'id',
+        'author': 'author__username',
+        'text': 'text',
+        'pub_date': 'pub_date',
+    }
+    converters = {'pub_date': pub_date_field.to_representation}
+
+
+def represent_genre(genre_id, snapshot=None):
+    snapshot = snapshot or catalogue.snapshot()
+    genre = snapshot.genres_by_id.get(genre_id)
+    if genre is None:
+        return None
+    return {'name': genre.name, 'slug': genre.slug}
+
+
+def represent_category(category_id, snapshot=None):
+    snapshot = snapshot or catalogue.snapshot()
+    category = snapshot.categories_by_id.get(category_id)
+    if category is None:
+        return None
+    return {'name': category.name, 'slug': category.slug}
+
+
+class TitleValuesReader(ValuesReader):
+    """Повторяет ``TitleListSerializer``. Рейтинг считается, только
+    если он запрошен; жанры страницы выбираются одним запросом
+    к ``TitleGenre``, названия жанров и категорий берутся из кэша
+    каталога: один снимок на всю страницу."""
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'year': 'year',
+        'rating': 'rating',
+        'reviews_count': 'reviews_count',
+        'description': 'description',
+        'genre': None,
+        'category': 'category_id',
+    }
+    converters = {'rating': int}
+
+    def lookups(self, fields):
+        lookups = super().lookups(fields)
+        if 'genre' in fields:
+            lookups.add('id')
+        return lookups
+
+    def prepare(self, queryset, fields=None):
+        fields = self.select(fields)
+        if 'rating' in fields:
+            queryset = queryset.annotate(rating=Avg('reviews__score'))
+        return super().prepare(queryset, fields)
+
+    def represent(self, row, fields=None, genre_ids=(), snapshot=None):
+        fields = self.select(fields)
+        ret = super().represent(
+            row, tuple(name for name in fields if name != 'genre')
+        )
+        if 'genre' not in fields and ret.get('category') is None:
+            return ret
+        snapshot = snapshot or catalogue.snapshot()
+        if ret.get('category') is not None:
+            ret['category'] = represent_category(ret['category'], snapshot)
+        if 'genre' in fields:
+            genres = map(snapshot.genres_by_id.get,
+                         sorted(genre_ids, reverse=True))
+            ret['genre'] = [
+                {'name': genre.name, 'slug': genre.slug}
+                for genre in genres if genre is not None
+            ]
+            return {name: ret[name] for name in fields}
+        return ret
+
+    def represent_many(self, rows, fields=None):
+        fields = self.select(fields)
+        rows = list(rows)
+        genre_ids = {}
+        if 'genre' in fields:
+            genre_ids = {row['id']: [] for row in rows}
+            links = TitleGenre.objects.filter(
+                title_id__in=genre_ids
+            ).values_list('title_id', 'genre_id')
+            for title_id, genre_id in links:
+                genre_ids[title_id].append(genre_id)
+        snapshot = catalogue.snapshot()
+        return [
+            self.represent(row, fields, genre_ids.get(row.get('id'), ()),
+                           snapshot)
+            for row in rows
+        ]
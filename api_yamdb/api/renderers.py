@@ -0,0 +1,74 @@
+import msgpack
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на базе orjson.
+
+    Выдаёт те же байты, что и стандартный рендерер: типы, которых
+    orjson не знает (Decimal, ленивые строки перевода), а также даты
+    передаются в ``JSONEncoder`` DRF. Без orjson, при запросе отступов
+    или ASCII-вывода используется стандартная реализация.
+    """
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        if data is None:
+            return b''
+        ret = orjson.dumps(
+            data,
+            default=self.encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        )
+        # Как и JSONRenderer, экранируем U+2028 и U+2029.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Рендерер MessagePack для машинных клиентов.
+
+    Структура ответа совпадает с JSON: даты, Decimal и ленивые строки
+    приводятся к тем же значениям через ``JSONEncoder`` DRF.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.encoder.default,
+                             use_bin_type=True)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Построчный JSON: по объекту на строку. Списки отзывов
+    и комментариев в этом формате отдаются потоком
+    (``StreamingListMixin``), здесь рендерятся только ошибки."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+    render_style = 'binary'
+    renderer = FastJSONRenderer()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(self.renderer.render(item) + b'\n' for item in items)
@@ -1,9 +1,104 @@
-from rest_framework import serializers
+from django.conf import settings
+from django.utils.encoding import smart_str
+from rest_framework import permissions, serializers
 from rest_framework.validators import UniqueValidator
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.catalogue import catalogue
+from reviews.models import (Category, Comment, DeletionTask, Genre, Review,
+                            Title)
+from reviews.stats import represent_histogram, title_histogram
 from users.models import User
 from users.validators import validate_username
 
+from .fieldsets import sparse_fields
+
+
+def catalogue_snapshot(field):
+    """Снимок каталога, общий для всех объектов одного сериализатора:
+    версия каталога сверяется один раз на ответ."""
+    context = field.context
+    if 'catalogue' not in context:
+        context['catalogue'] = catalogue.snapshot()
+    return context['catalogue']
+
+
+class CatalogueSlugRelatedField(serializers.SlugRelatedField):
+    """Поле, разрешающее slug жанра или категории через кэш каталога
+    вместо запроса к базе данных."""
+    lookup = None
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        obj = getattr(catalogue, self.lookup)(str(data))
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        return obj
+
+
+class GenreSlugRelatedField(CatalogueSlugRelatedField):
+    lookup = 'genre_by_slug'
+
+
+class CategorySlugRelatedField(CatalogueSlugRelatedField):
+    lookup = 'category_by_slug'
+
+    def get_attribute(self, instance):
+        return catalogue_snapshot(self).categories_by_id.get(
+            instance.category_id
+        )
+
+
+class CatalogueCategoryField(serializers.Field):
+    """Вложенная категория произведения, отрисованная из кэша каталога."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs.setdefault('source', 'category_id')
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        category = catalogue_snapshot(self).categories_by_id.get(value)
+        if category is None:
+            return None
+        return {'name': category.name, 'slug': category.slug}
+
+
+class CatalogueGenreField(serializers.Field):
+    """Вложенные жанры произведения, отрисованные из кэша каталога.
+    Ожидает предзагруженные связи ``titlegenre_set``."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs.setdefault('source', 'titlegenre_set')
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        snapshot = catalogue_snapshot(self)
+        genre_ids = sorted(
+            (link.genre_id for link in value.all()), reverse=True
+        )
+        return [
+            {'name': genre.name, 'slug': genre.slug}
+            for genre in map(snapshot.genres_by_id.get, genre_ids)
+            if genre is not None
+        ]
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе на чтение только поля, выбранные
+    параметрами ``?fields=`` и ``?omit=``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return
+        selected = sparse_fields(request, tuple(self.fields))
+        if selected is not None:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
+
 
 class SignUpSerializer(serializers.Serializer):
     username = serializers.CharField(
@@ -34,6 +129,53 @@ class TokenSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(required=True)
 
 
+class BatchItemSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(
+        choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+    )
+    path = serializers.RegexField(r'^/api/v1/', max_length=2000)
+    body = serializers.JSONField(required=False, allow_null=True)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = serializers.ListField(
+        child=BatchItemSerializer(),
+        allow_empty=False,
+        max_length=settings.BATCH_MAX_REQUESTS
+    )
+    atomic = serializers.BooleanField(default=False)
+
+
+class ModerationSerializer(serializers.Serializer):
+    target = serializers.ChoiceField(choices=['reviews', 'comments'])
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=10000
+    )
+    author = serializers.CharField(required=False, max_length=150)
+    title = serializers.IntegerField(required=False, min_value=1)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not any(data.get(field) for field in
+                   ('ids', 'author', 'title', 'since', 'until')):
+            raise serializers.ValidationError(
+                'Укажите id или хотя бы один фильтр.'
+            )
+        return data
+
+
+class DeletionTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        fields = (
+            'id', 'target', 'object_id', 'status', 'processed', 'error',
+            'created', 'finished'
+        )
+        model = DeletionTask
+
+
 class UserSerializer(serializers.ModelSerializer):
     username = serializers.CharField(
         required=True,
@@ -67,7 +209,7 @@ class UserMeSerializer(serializers.ModelSerializer):
         read_only_fields = ('role',)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True
@@ -75,9 +217,9 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        exclude = ['title']
+        exclude = ['title', 'updated_at']
         read_only_fields = (
-            'id', 'author', 'pub_date',
+            'id', 'author', 'pub_date', 'comments_count',
         )
 
     def validate(self, data):
@@ -89,7 +231,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True
@@ -97,7 +239,7 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Comment
-        exclude = ['review']
+        exclude = ['review', 'updated_at']
         read_only_fields = (
             'id', 'author', 'pub_date',
         )
@@ -106,41 +248,51 @@ class CommentSerializer(serializers.ModelSerializer):
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        exclude = ['id']
+        exclude = ['id', 'is_hidden', 'updated_at']
         lookup_field = 'slug'
 
 
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Genre
-        exclude = ['id']
+        exclude = ['id', 'updated_at']
         lookup_field = 'slug'
 
 
 class TitleSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
+    genre = GenreSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True
     )
-    category = serializers.SlugRelatedField(
+    category = CategorySlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug'
     )
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ['is_hidden', 'updated_at', 'reviews_count']
 
 
-class TitleListSerializer(serializers.ModelSerializer):
-    category = CategorySerializer(read_only=True)
-    genre = GenreSerializer(many=True, read_only=True)
+class TitleListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    category = CatalogueCategoryField()
+    genre = CatalogueGenreField()
     rating = serializers.IntegerField()
 
     class Meta:
         model = Title
         fields = [
-            'id', 'name', 'year', 'rating',
+            'id', 'name', 'year', 'rating', 'reviews_count',
             'description', 'genre', 'category'
         ]
+
+
+class TitleDetailSerializer(TitleListSerializer):
+    scores = serializers.SerializerMethodField()
+
+    class Meta(TitleListSerializer.Meta):
+        fields = TitleListSerializer.Meta.fields + ['scores']
+
+    def get_scores(self, obj):
+        return represent_histogram(title_histogram(obj.pk))
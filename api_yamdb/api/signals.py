@@ -0,0 +1,174 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from reviews.changes import Action, Resource, record_changes
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from users.models import User
+
+from .events import publish_event
+from .feed import activity_feed, comment_event, review_event
+from .fragments import fragment_store
+from .versions import versions
+
+
+def change_action(signal, instance):
+    """Скрытый до удаления объект для зеркал уже удалён."""
+    if signal is post_delete or getattr(instance, 'is_hidden', False):
+        return Action.DELETE
+    return Action.UPSERT
+
+
+def invalidate_titles(*pks):
+    fragment_store.invalidate(*pks)
+    versions.bump(*(('title', pk) for pk in pks))
+
+
+def invalidate_catalogue_views():
+    versions.bump(('facets',))
+    activity_feed.invalidate()
+
+
+def rating_changed(*pks):
+    """Представление произведения изменилось: записывает изменение
+    в журнал для зеркал в транзакции записи и сбрасывает кэши после
+    её фиксации. Иначе параллельный запрос успел бы закэшировать
+    под новой версией ещё не зафиксированные строки."""
+    record_changes(Resource.TITLE, [(pk,) for pk in pks])
+    transaction.on_commit(lambda: invalidate_titles(*pks))
+
+
+def title_changed(*pks):
+    """Изменение самого произведения или его жанров влияет ещё
+    и на счётчики фасетов."""
+    rating_changed(*pks)
+    transaction.on_commit(invalidate_catalogue_views)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title_fragment(sender, instance, **kwargs):
+    title_changed(instance.pk)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def record_title_removal(sender, instance, signal, **kwargs):
+    """Обновления произведений записывает ``rating_changed``."""
+    if change_action(signal, instance) == Action.DELETE:
+        record_changes(Resource.TITLE, [(instance.pk,)], Action.DELETE)
+
+
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+def invalidate_related_title_fragment(sender, instance, **kwargs):
+    title_changed(instance.title_id)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, signal, **kwargs):
+    rating_changed(instance.title_id)
+    transaction.on_commit(
+        lambda: versions.bump(('reviews', instance.title_id))
+    )
+    record_changes(Resource.REVIEW, [(instance.pk, instance.title_id)],
+                   change_action(signal, instance))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, signal, **kwargs):
+    title_id = instance.review.title_id
+    resources = [('comments', instance.review_id)]
+    record_changes(Resource.COMMENT,
+                   [(instance.pk, title_id, instance.review_id)],
+                   change_action(signal, instance))
+    if kwargs.get('created', signal is post_delete):
+        # У отзыва изменилось число комментариев.
+        resources.append(('reviews', title_id))
+        record_changes(Resource.REVIEW, [(instance.review_id, title_id)])
+    transaction.on_commit(lambda: versions.bump(*resources))
+
+
+def publish(event):
+    """Новое событие попадает в ленту и к подписчикам произведения."""
+    activity_feed.push(event)
+    publish_event(event)
+
+
+@receiver(post_save, sender=Review)
+def review_published(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish(review_event(instance)))
+    else:
+        transaction.on_commit(activity_feed.invalidate)
+
+
+@receiver(post_save, sender=Comment)
+def comment_published(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish(comment_event(instance)))
+    else:
+        transaction.on_commit(activity_feed.invalidate)
+
+
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def publication_deleted(sender, **kwargs):
+    transaction.on_commit(activity_feed.invalidate)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def catalogue_changed(sender, instance, signal, **kwargs):
+    transaction.on_commit(lambda: versions.bump(('catalogue',)))
+    resource = (Resource.GENRE if sender is Genre else Resource.CATEGORY)
+    record_changes(resource, [(instance.pk,)],
+                   change_action(signal, instance))
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields, **kwargs):
+    instance._previous_username = None
+    if instance.pk is not None and (update_fields is None
+                                    or 'username' in update_fields):
+        instance._previous_username = User.objects.filter(
+            pk=instance.pk
+        ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    """Имя автора выводится в отзывах и комментариях: при его
+    смене сбрасываются их кэши."""
+    previous = getattr(instance, '_previous_username', None)
+    if created or previous is None or previous == instance.username:
+        return
+    reviews = list(Review.objects.filter(
+        author=instance).values_list('id', 'title_id'))
+    comments = list(Comment.objects.filter(
+        author=instance).values_list('id', 'review__title_id', 'review_id'))
+    if reviews or comments:
+        resources = {('reviews', title_id) for _, title_id in reviews} | {
+            ('comments', review_id) for _, _, review_id in comments
+        }
+        transaction.on_commit(lambda: versions.bump(*resources))
+        transaction.on_commit(activity_feed.invalidate)
+        record_changes(Resource.REVIEW, reviews)
+        record_changes(Resource.COMMENT, comments)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genre_fragments(sender, instance, action, reverse,
+                                     pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        title_changed(*TitleGenre.objects.filter(
+            genre=instance).values_list('title_id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            title_changed(instance.pk)
+        elif pk_set:
+            title_changed(*pk_set)
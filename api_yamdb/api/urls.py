@@ -1,7 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
+from .views import (ActivityFeedView, AnalyticsViewSet, BatchView,
+                    CategoryViewSet, ChangeFeedView, CommentViewSet,
+                    DeletionTaskViewSet, GenreViewSet, ModerationView,
                     ReviewViewSet, SignUpView, TitleViewSet, TokenObtainView,
                     UserViewSet)
 
@@ -19,9 +21,15 @@ router.register(
     basename="comments",
 )
 router.register(r"users", UserViewSet, basename="users")
+router.register(r"deletions", DeletionTaskViewSet, basename="deletions")
+router.register(r"analytics", AnalyticsViewSet, basename="analytics")
 
 urlpatterns = [
     path("v1/auth/signup/", SignUpView.as_view()),
     path("v1/auth/token/", TokenObtainView.as_view()),
+    path("v1/batch/", BatchView.as_view(), name="batch"),
+    path("v1/activity/", ActivityFeedView.as_view()),
+    path("v1/changes/", ChangeFeedView.as_view()),
+    path("v1/moderation/delete/", ModerationView.as_view()),
     path("v1/", include(router.urls)),
 ]
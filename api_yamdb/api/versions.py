@@ -0,0 +1,46 @@
+import time
+import uuid
+
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = 'api:version'
+
+
+class ResourceVersions:
+    """Счётчики версий ресурсов API для валидаторов ETag/Last-Modified.
+
+    Версия ресурса — пара из случайного токена и времени изменения,
+    которая хранится в общем кэше Django и заменяется при каждом
+    изменении ресурса. Ресурс задаётся кортежем, например
+    ``('reviews', title_id)``.
+    """
+
+    @staticmethod
+    def make_key(resource):
+        return ':'.join(str(part) for part in (VERSION_KEY_PREFIX,)
+                        + resource)
+
+    def get_many(self, resources):
+        """Возвращает версии ресурсов, заводя отсутствующие."""
+        keys = [self.make_key(resource) for resource in resources]
+        found = cache.get_many(keys)
+        missing = {
+            key: (uuid.uuid4().hex, time.time())
+            for key in keys if key not in found
+        }
+        for key, version in missing.items():
+            cache.add(key, version, None)
+        if missing:
+            found.update(cache.get_many(missing))
+        return [found.get(key, missing.get(key)) for key in keys]
+
+    def bump(self, *resources):
+        now = time.time()
+        cache.set_many(
+            {self.make_key(resource): (uuid.uuid4().hex, now)
+             for resource in resources},
+            None
+        )
+
+
+versions = ResourceVersions()
@@ -1,26 +1,53 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import Avg, Case, IntegerField, Value, When
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.activity import trending_titles
+from reviews.models import (AuthorRollup, Category, DeletionTask, Genre,
+                            Review, ReviewRollup, ScoreRollup, Title,
+                            TitleNeighbours)
+from reviews.stats import represent_histogram, title_histogram
 from users.models import User
 
+from .batch import render_batch, run_subrequest
+from .bulk import bulk_save_titles
+from .changes import read_changes
+from .deletion import being_deleted
+from .expansion import EXPANSIONS, expand_reviews, newest_review_ids
+from .facets import title_facets
+from .feed import activity_feed
+from .fieldsets import sparse_fields
 from .filters import TitleFilter
-from .mixins import ListCreateDestroyViewSet
+from .fragments import fragment_store
+from .memo import memoize, shared_memo
+from .mixins import (BackgroundDestroyMixin, ConditionalMixin,
+                     ListCreateDestroyViewSet, StreamingListMixin,
+                     ValuesListMixin)
+from .moderation import delete_comments, delete_reviews
 from .permissions import (IsAdminAuthorModeratorOrReadOnly, IsAdminOnly,
-                          IsAdminOrReadOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, ReviewSerializer, SignUpSerializer,
-                          TitleListSerializer, TitleSerializer,
-                          TokenSerializer, UserMeSerializer, UserSerializer)
+                          IsAdminOrModerator, IsAdminOrReadOnly,
+                          IsMachineClient)
+from .readers import (CommentValuesReader, ReviewValuesReader,
+                      TitleValuesReader, represent_category, represent_genre)
+from .serializers import (BatchSerializer, CategorySerializer,
+                          CommentSerializer, DeletionTaskSerializer,
+                          GenreSerializer, ModerationSerializer,
+                          ReviewSerializer, SignUpSerializer,
+                          TitleDetailSerializer, TitleListSerializer,
+                          TitleSerializer, TokenSerializer, UserMeSerializer,
+                          UserSerializer)
 
 
 class SignUpView(generics.CreateAPIView):
@@ -73,12 +100,181 @@ class TokenObtainView(generics.CreateAPIView):
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
-    """Управление пользователем.
+class BatchView(generics.GenericAPIView):
+    """Выполнение нескольких запросов к API за один.
+    Подзапросы выполняются по порядку от имени текущего пользователя
+    и с общей мемоизацией. С ``atomic`` все изменения откатываются,
+    если хотя бы один подзапрос завершился ошибкой.
+    """
+    serializer_class = BatchSerializer
+    permission_classes = (AllowAny,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['requests']
+        with shared_memo():
+            if not serializer.validated_data['atomic']:
+                results = [run_subrequest(request, item) for item in items]
+            else:
+                with transaction.atomic():
+                    results = []
+                    for item in items:
+                        results.append(run_subrequest(request, item))
+                        if results[-1][0] >= 400:
+                            transaction.set_rollback(True)
+                            break
+        return HttpResponse(render_batch(results),
+                            content_type='application/json')
+
+
+class ActivityFeedView(generics.GenericAPIView):
+    """Последние отзывы и комментарии ко всем произведениям.
+    Ответ собирается из готовых JSON-событий в памяти без запросов
+    к базе. Число событий задаёт ``?limit=`` (не больше
+    ``ACTIVITY_FEED_SIZE``).
+    """
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            raise ValidationError({'limit': ['Ожидалось целое число.']})
+        limit = max(1, min(limit, settings.ACTIVITY_FEED_SIZE))
+        return HttpResponse(
+            b'[' + b','.join(activity_feed.events(limit)) + b']',
+            content_type='application/json'
+        )
+
+
+class ChangeFeedView(generics.GenericAPIView):
+    """Журнал изменений для синхронизации зеркал. Ответ содержит
+    пачку изменений после ``?cursor=`` и курсор следующей пачки.
+    Доступно машинным клиентам.
+    """
+    permission_classes = (IsMachineClient,)
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get(
+                'limit', settings.CHANGES_BATCH_SIZE))
+        except ValueError:
+            raise ValidationError({'limit': ['Ожидалось целое число.']})
+        limit = max(1, min(limit, settings.CHANGES_BATCH_SIZE))
+        return Response(
+            read_changes(request.query_params.get('cursor'), limit)
+        )
+
+
+class ModerationView(generics.GenericAPIView):
+    """Массовое удаление отзывов или комментариев по списку id
+    или по автору, произведению и периоду публикации.
+    Доступно для модераторов и администраторов.
+    """
+    serializer_class = ModerationSerializer
+    permission_classes = (IsAdminOrModerator,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        criteria = serializer.validated_data
+        if criteria['target'] == 'reviews':
+            deleted = delete_reviews(criteria)
+        else:
+            deleted = delete_comments(criteria)
+        return Response(deleted, status=status.HTTP_200_OK)
+
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """Лидеры и средние оценки по сводным таблицам.
+    Число строк ограничено ``?limit=`` (не больше
+    ``ANALYTICS_MAX_ROWS``).
+    """
+    permission_classes = (AllowAny,)
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', 10))
+        except ValueError:
+            raise ValidationError({'limit': ['Ожидалось целое число.']})
+        return max(1, min(limit, settings.ANALYTICS_MAX_ROWS))
+
+    @action(detail=False, methods=['get'])
+    def reviewers(self, request):
+        """Пользователи с наибольшим числом отзывов."""
+        rows = AuthorRollup.objects.filter(reviews_count__gt=0).exclude(
+            user_id__in=being_deleted(DeletionTask.TargetChoices.USER)
+        ).order_by('-reviews_count', 'user_id').values_list(
+            'user__username', 'reviews_count', 'comments_count'
+        )[:self.get_limit()]
+        return Response([
+            {'username': username, 'reviews_count': reviews_count,
+             'comments_count': comments_count}
+            for username, reviews_count, comments_count in rows
+        ])
+
+    @action(detail=False, methods=['get'])
+    def discussed(self, request):
+        """Отзывы с наибольшим числом комментариев."""
+        rows = ReviewRollup.objects.filter(
+            comments_count__gt=0, review__title__is_hidden=False
+        ).order_by('-comments_count', 'review_id').values_list(
+            'review_id', 'review__title_id', 'review__author__username',
+            'comments_count'
+        )[:self.get_limit()]
+        return Response([
+            {'id': pk, 'title': title_id, 'author': author,
+             'comments_count': comments_count}
+            for pk, title_id, author, comments_count in rows
+        ])
+
+    @action(detail=False, methods=['get'])
+    def scores(self, request):
+        """Средняя оценка по ``?by=`` — genre, category или year."""
+        by = request.query_params.get('by', ScoreRollup.DimensionChoices.GENRE)
+        if by not in ScoreRollup.DimensionChoices.values:
+            raise ValidationError({'by': [
+                'Допустимые значения: '
+                f'{", ".join(ScoreRollup.DimensionChoices.values)}.'
+            ]})
+        labels = {
+            'genre': represent_genre,
+            'category': represent_category,
+            'year': lambda year: year,
+        }
+        data = []
+        rows = ScoreRollup.objects.filter(
+            dimension=by, count__gt=0
+        ).values_list('key', 'count', 'total')
+        for key, count, total in rows:
+            label = labels[by](key)
+            if label is not None:
+                data.append({by: label, 'count': count,
+                             'average': round(total / count, 2)})
+        data.sort(key=lambda item: (-item['average'], -item['count']))
+        return Response(data[:self.get_limit()])
+
+
+class DeletionTaskViewSet(viewsets.ReadOnlyModelViewSet):
+    """Прогресс фоновых удалений.
     Доступно для администраторов.
     """
-    queryset = User.objects.all().order_by('-id')
+    queryset = DeletionTask.objects.all()
+    serializer_class = DeletionTaskSerializer
+    permission_classes = (IsAdminOnly,)
+
+
+class UserViewSet(BackgroundDestroyMixin, viewsets.ModelViewSet):
+    """Управление пользователем.
+    Доступно для администраторов. Пользователи, удаляемые в фоне,
+    не показываются; просто деактивированные остаются видны.
+    """
+    queryset = User.objects.exclude(
+        pk__in=being_deleted(DeletionTask.TargetChoices.USER)
+    ).order_by('-id')
     serializer_class = UserSerializer
+    deletion_target = DeletionTask.TargetChoices.USER
     lookup_field = 'username'
     permission_classes = (IsAdminOnly,)
     filter_backends = (filters.SearchFilter,)
@@ -108,48 +304,69 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalMixin, StreamingListMixin, ValuesListMixin,
+                    viewsets.ModelViewSet):
     """Получение/создание/обновление/удаление
     отзыва к произведению
     """
     serializer_class = ReviewSerializer
+    values_reader = ReviewValuesReader()
+    lookup_value_regex = r'\d+'
+    version_resource = 'reviews'
+    version_kwarg = 'title_id'
     permission_classes = (IsAdminAuthorModeratorOrReadOnly,
                           IsAuthenticatedOrReadOnly)
 
+    def get_title(self):
+        title_id = self.kwargs.get('title_id')
+        return memoize(('title', title_id),
+                       lambda: get_object_or_404(Title, pk=title_id,
+                                                 is_hidden=False))
+
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.get_title().reviews.all()
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalMixin, StreamingListMixin, ValuesListMixin,
+                     viewsets.ModelViewSet):
     """Получение/создание/обновление/удаление
     комментария к отзыву о произведении
     """
     serializer_class = CommentSerializer
+    values_reader = CommentValuesReader()
+    lookup_value_regex = r'\d+'
+    version_resource = 'comments'
+    version_kwarg = 'review_id'
     permission_classes = (IsAdminAuthorModeratorOrReadOnly,
                           IsAuthenticatedOrReadOnly)
 
+    def get_review(self):
+        title_id = self.kwargs.get('title_id')
+        review_id = self.kwargs.get('review_id')
+        return memoize(
+            ('review', title_id, review_id),
+            lambda: get_object_or_404(Review, pk=review_id,
+                                      title__id=title_id,
+                                      title__is_hidden=False)
+        )
+
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return self.get_review().comments.all()
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review,
-                                   id=self.kwargs.get('review_id'),
-                                   title__id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(BackgroundDestroyMixin, ListCreateDestroyViewSet):
     """Получение списка всех категорий.
     Создание/удаление категории.
     """
-    queryset = Category.objects.all()
+    queryset = Category.objects.filter(is_hidden=False)
     serializer_class = CategorySerializer
+    deletion_target = DeletionTask.TargetChoices.CATEGORY
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
@@ -169,18 +386,227 @@ class GenreViewSet(ListCreateDestroyViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(BackgroundDestroyMixin, ConditionalMixin, ValuesListMixin,
+                   viewsets.ModelViewSet):
     """Получение списка всех произведений.
     Получение информации о конкретном произведении.
     Создание/обновление/удаление произведения.
     """
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('-id')
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    values_reader = TitleValuesReader()
+    lookup_value_regex = r'\d+'
+    conditional_actions = ('retrieve',)
+    version_resource = 'title'
+    deletion_target = DeletionTask.TargetChoices.TITLE
+
+    def get_version_resources(self):
+        resources = super().get_version_resources() + [('catalogue',)]
+        if 'reviews' in self.get_expansions():
+            self.expanded_review_ids = newest_review_ids(self.kwargs['pk'])
+            resources += [('reviews', self.kwargs['pk'])] + [
+                ('comments', pk) for pk in self.expanded_review_ids
+            ]
+        return resources
+
+    def get_expansions(self):
+        """Связанные данные, встраиваемые в ответ по ``?expand=``."""
+        if self.action != 'retrieve':
+            return ()
+        requested = self.request.query_params.get('expand')
+        if not requested:
+            return ()
+        expansions = tuple(requested.split(','))
+        unknown = set(expansions) - set(EXPANSIONS)
+        if unknown:
+            raise ValidationError({'expand': [
+                f'Допустимые значения: {", ".join(EXPANSIONS)}.'
+            ]})
+        return expansions
+
+    def get_expanded(self):
+        if 'reviews' not in self.get_expansions():
+            return {}
+        review_ids = getattr(self, 'expanded_review_ids', None)
+        if review_ids is None:
+            review_ids = newest_review_ids(self.kwargs['pk'])
+        return {'reviews': expand_reviews(review_ids)}
+
+    def get_queryset(self):
+        """Для списка колонки и рейтинг добавляет ``values_reader``,
+        для просмотра произведения запрос сужается по ``?fields=``."""
+        queryset = Title.objects.filter(is_hidden=False).order_by('-id')
+        if self.action == 'top':
+            return queryset.filter(score_stats__count__gt=0).order_by(
+                '-score_stats__weighted', 'id'
+            )
+        if self.action != 'retrieve':
+            return queryset
+        fields = self.get_sparse_fields() or tuple(self.values_reader.fields)
+        if 'rating' in fields:
+            queryset = queryset.annotate(rating=Avg('reviews__score'))
+        if 'genre' in fields:
+            queryset = queryset.prefetch_related('titlegenre_set')
+        return queryset.only('id', *(
+            name for name in ('name', 'year', 'description', 'category',
+                              'reviews_count')
+            if name in fields
+        ))
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action == 'retrieve':
+            return TitleDetailSerializer
+        if self.action in ('list', 'top', 'trending', 'similar'):
             return TitleListSerializer
         return TitleSerializer
+
+    def get_sparse_fields(self):
+        available = tuple(self.values_reader.fields)
+        if self.action == 'retrieve':
+            available += ('scores',)
+        return sparse_fields(self.request, available)
+
+    @action(detail=False, methods=['get'], url_path='top')
+    def top(self, request):
+        """Произведения с отзывами по убыванию байесовской оценки."""
+        return self.list(request)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Создание и обновление произведений пачкой.
+        Элемент с ``id`` обновляет произведение, без ``id`` — создаёт.
+        Ошибки возвращаются по каждому элементу."""
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Ожидался список произведений.'},
+                status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > settings.BULK_MAX_TITLES:
+            return Response(
+                {'detail': f'Не больше {settings.BULK_MAX_TITLES} '
+                           f'произведений за запрос.'},
+                status.HTTP_400_BAD_REQUEST
+            )
+        return Response(bulk_save_titles(request.data))
+
+    def use_fragments(self):
+        """Готовые фрагменты подходят только для компактного JSON
+        с полным набором полей."""
+        return (isinstance(self.request.accepted_renderer, JSONRenderer)
+                and 'indent' not in self.request.accepted_media_type
+                and self.get_sparse_fields() is None)
+
+    def list(self, request, *args, **kwargs):
+        """Страница собирается из готовых JSON-фрагментов: запрос
+        к базе выбирает только id произведений."""
+        if not self.use_fragments():
+            response = super().list(request, *args, **kwargs)
+            facets = self.get_facets()
+            if facets is not None:
+                response.data['facets'] = facets
+            return response
+        return self.fragment_list(self.filter_queryset(
+            self.get_queryset()
+        ).values_list('pk', flat=True))
+
+    def get_facets(self):
+        """Счётчики по жанрам, категориям и годам для ``?facets=true``
+        в списке произведений."""
+        requested = self.request.query_params.get('facets')
+        if self.action != 'list' or requested not in ('1', 'true'):
+            return None
+        return title_facets(self.filter_queryset(self.get_queryset()),
+                            self.request.query_params)
+
+    def fragment_list(self, pks):
+        page = self.paginate_queryset(pks)
+        if page is None:
+            return self.fragment_response(
+                b'[' + b','.join(fragment_store.get_many(list(pks))) + b']'
+            )
+        envelope = self.get_paginated_response([]).data
+        del envelope['results']
+        facets = self.get_facets()
+        if facets is not None:
+            envelope['facets'] = facets
+        envelope['results'] = None
+        head = fragment_store.renderer.render(envelope)[:-len(b'null}')]
+        return self.fragment_response(
+            head + b'[' + b','.join(fragment_store.get_many(page)) + b']}'
+        )
+
+    @action(detail=False, methods=['get'], url_path='trending')
+    def trending(self, request):
+        """Самые обсуждаемые произведения за ``?window=`` (24h или 7d)
+        по готовому рейтингу из счётчиков активности."""
+        window = request.query_params.get('window', '24h')
+        if window not in settings.TRENDING_WINDOWS:
+            raise ValidationError({'window': [
+                f'Допустимые значения: {", ".join(settings.TRENDING_WINDOWS)}.'
+            ]})
+        pks = trending_titles(window)
+        if self.use_fragments():
+            return self.fragment_list(pks)
+        page = self.paginate_queryset(pks)
+        if page is None:
+            return Response(self.represent_in_order(pks))
+        return self.get_paginated_response(self.represent_in_order(page))
+
+    @action(detail=True, methods=['get'], url_path='similar')
+    def similar(self, request, pk=None):
+        """Похожие произведения из заранее рассчитанных соседей."""
+        neighbours = TitleNeighbours.objects.filter(
+            title_id=pk, title__is_hidden=False
+        ).values_list('neighbours', flat=True).first()
+        if neighbours is None:
+            get_object_or_404(Title, pk=pk, is_hidden=False)
+            neighbours = []
+        pks = [neighbour_id for neighbour_id, _ in neighbours]
+        if self.use_fragments():
+            return self.fragment_response(
+                b'[' + b','.join(fragment_store.get_many(pks)) + b']'
+            )
+        return Response(self.represent_in_order(pks))
+
+    def represent_in_order(self, pks):
+        """Произведения в порядке ``pks`` через ``values_reader``."""
+        if not pks:
+            return []
+        positions = [When(pk=pk, then=Value(position))
+                     for position, pk in enumerate(pks)]
+        queryset = Title.objects.filter(
+            pk__in=pks, is_hidden=False
+        ).order_by(Case(*positions, output_field=IntegerField()))
+        fields = self.get_sparse_fields()
+        return self.values_reader.represent_many(
+            self.values_reader.prepare(queryset, fields), fields
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """С ``?expand=reviews`` в ответ встраиваются новейшие отзывы
+        с числом комментариев и первыми комментариями."""
+        if not self.use_fragments():
+            response = super().retrieve(request, *args, **kwargs)
+            response.data.update(self.get_expanded())
+            return response
+        pk = int(kwargs['pk'])
+        fragment = fragment_store.get(pk)
+        if fragment is None:
+            raise Http404
+        scores = fragment_store.renderer.render(
+            represent_histogram(title_histogram(pk))
+        )
+        expanded = b''.join(
+            b',"%s":%s' % (name.encode(), fragment_store.renderer.render(data))
+            for name, data in self.get_expanded().items()
+        )
+        return self.fragment_response(
+            fragment[:-1] + b',"scores":' + scores + expanded + b'}'
+        )
+
+    @staticmethod
+    def fragment_response(content):
+        response = HttpResponse(content, content_type='application/json')
+        response.compressed_cache = True
+        return response
@@ -2,6 +2,10 @@
 ASGI config for YaMDb project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Server-Sent Events of titles (``/api/v1/titles/{id}/events/``) are served
+by ``api.events`` directly, hot reads (titles, reviews and comments lists,
+title detail) run the regular sync views in a bounded thread pool
+(``api.async_reads``), everything else is handled by Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -13,4 +17,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Модули api импортируются после настройки Django.
+from api.async_reads import PooledReads  # noqa: E402
+from api.events import route_events  # noqa: E402
+
+application = route_events(PooledReads(django_application))
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -85,6 +86,28 @@ DATABASES = {
 }
 
 
+# Cache
+# Версии кэша каталога должны быть видны всем воркерам, поэтому
+# в боевом окружении нужен общий бэкенд (например, memcached).
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+
+# Response compression
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+COMPRESSED_CACHE_TIMEOUT = 300
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -126,6 +149,17 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "api.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.parsers.FastJSONParser",
+        "api.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 SIMPLE_JWT = {
@@ -133,6 +167,57 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+BATCH_MAX_REQUESTS = 20
+BULK_MAX_TITLES = 500
+
+DELETION_CHUNK_SIZE = 500
+
+RATING_PRIOR_COUNT = 5
+
+RATING_PRIOR_MEAN = 5.5
+
+TRENDING_WINDOWS = {'24h': 24, '7d': 24 * 7}
+
+TRENDING_SIZE = 100
+
+TRENDING_REFRESH_INTERVAL = 300
+
+ACTIVITY_HOURLY_RETENTION = 48
+
+ANALYTICS_MAX_ROWS = 100
+
+FACETS_CACHE_TIMEOUT = 3600
+
+SIMILAR_TITLES_COUNT = 20
+
+SIMILAR_MIN_SCORE = 7
+
+ACTIVITY_FEED_SIZE = 100
+
+STREAM_CHUNK_SIZE = 500
+
+MACHINE_CLIENTS_GROUP = 'machine-clients'
+
+EXPAND_REVIEWS = 5
+
+EXPAND_COMMENTS = 3
+
+ASYNC_READ_THREADS = int(os.getenv("ASYNC_READ_THREADS", 8))
+
+EVENTS_BROKER = 'api.broker.LocalBroker'
+
+EVENTS_QUEUE_SIZE = 100
+
+EVENTS_HEARTBEAT = 15
+
+EVENTS_RETRY_MS = 3000
+
+CHANGES_BATCH_SIZE = 500
+
+CHANGES_SETTLE_SECONDS = 5
+
+CHANGES_RETENTION_DAYS = 7
+
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = BASE_DIR / "sent_emails"
 EMAIL_ADMIN = "admin@yamdb.ru"
@@ -0,0 +1,92 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+from reviews.models import TitleActivity
+from reviews.rollups import increment
+
+TRENDING_KEY_PREFIX = 'reviews:trending'
+
+
+def hour_bucket(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def record_activity(title_id, moment=None):
+    """Увеличивает часовой счётчик активности произведения."""
+    increment(TitleActivity, {
+        'title_id': title_id,
+        'bucket': hour_bucket(moment or timezone.now()),
+    }, count=1)
+
+
+@transaction.atomic
+def compact_activity(now=None):
+    """Удаляет счётчики старше самого длинного окна и сводит часовые
+    счётчики старше ``ACTIVITY_HOURLY_RETENTION`` часов в дневные.
+    Возвращает число удалённых строк."""
+    now = now or timezone.now()
+    horizon = now - datetime.timedelta(
+        hours=max(settings.TRENDING_WINDOWS.values())
+    )
+    removed, _ = TitleActivity.objects.filter(bucket__lt=horizon).delete()
+    cutoff = timezone.localtime(now - datetime.timedelta(
+        hours=settings.ACTIVITY_HOURLY_RETENTION
+    )).replace(hour=0, minute=0, second=0, microsecond=0)
+    old = TitleActivity.objects.filter(bucket__lt=cutoff)
+    days = list(old.annotate(day=TruncDay('bucket')).values(
+        'title_id', 'day'
+    ).annotate(total=Sum('count')).order_by())
+    merged, _ = old.delete()
+    TitleActivity.objects.bulk_create([
+        TitleActivity(title_id=row['title_id'], bucket=row['day'],
+                      count=row['total'])
+        for row in days
+    ])
+    return removed + merged - len(days)
+
+
+def rank_titles(window, now=None):
+    """Id самых активных за окно произведений по счётчикам."""
+    since = (now or timezone.now()) - datetime.timedelta(
+        hours=settings.TRENDING_WINDOWS[window]
+    )
+    return list(TitleActivity.objects.filter(
+        bucket__gte=hour_bucket(since), title__is_hidden=False
+    ).values('title_id').annotate(total=Sum('count')).order_by(
+        '-total', '-title_id'
+    ).values_list('title_id', flat=True)[:settings.TRENDING_SIZE])
+
+
+def trending_key(window):
+    return f'{TRENDING_KEY_PREFIX}:{window}'
+
+
+def refresh_trending(window):
+    ranking = rank_titles(window)
+    cache.set(trending_key(window), (time.time(), ranking), None)
+    return ranking
+
+
+def trending_titles(window):
+    """Готовый рейтинг окна; пересчитывается по счётчикам не чаще
+    раза в ``TRENDING_REFRESH_INTERVAL`` секунд. Устаревший рейтинг
+    пересчитывает один воркер, взявший блокировку в общем кэше,
+    остальные до конца пересчёта отдают прежний."""
+    stored = cache.get(trending_key(window))
+    if stored is None:
+        return refresh_trending(window)
+    if time.time() - stored[0] <= settings.TRENDING_REFRESH_INTERVAL:
+        return stored[1]
+    lock = f'{trending_key(window)}:lock'
+    if not cache.add(lock, True, settings.TRENDING_REFRESH_INTERVAL):
+        return stored[1]
+    try:
+        return refresh_trending(window)
+    finally:
+        cache.delete(lock)
@@ -2,7 +2,8 @@ from django.contrib import admin
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 from import_export.fields import Field
-from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.models import (Category, Comment, DeletionTask, Genre, Review,
+                            Title, TitleGenre)
 
 
 class CategoryResource(resources.ModelResource):
@@ -138,9 +139,32 @@ class CommentAdmin(ImportExportModelAdmin):
     )
 
 
+class DeletionTaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'target',
+        'object_id',
+        'status',
+        'processed',
+        'created',
+        'finished',
+    )
+    list_filter = ('status', 'target')
+    readonly_fields = (
+        'target',
+        'object_id',
+        'status',
+        'processed',
+        'error',
+        'created',
+        'finished',
+    )
+
+
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Genre, GenreAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(TitleGenre, TitleGenreAdmin)
 admin.site.register(Review, ReviewAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(DeletionTask, DeletionTaskAdmin)
@@ -0,0 +1,80 @@
+import threading
+import uuid
+
+from django.core.cache import cache
+from reviews.models import Category, Genre
+
+CATALOGUE_VERSION_KEY = 'reviews:catalogue:version'
+
+
+class CatalogueSnapshot:
+    """Неизменяемый снимок таблиц жанров и категорий."""
+
+    def __init__(self, version, genres, categories):
+        self.version = version
+        self.genres_by_id = {genre.pk: genre for genre in genres}
+        self.genres_by_slug = {genre.slug: genre for genre in genres}
+        self.categories_by_id = {
+            category.pk: category for category in categories
+        }
+        self.categories_by_slug = {
+            category.slug: category for category in categories
+        }
+
+
+class Catalogue:
+    """Локальный для процесса кэш жанров и категорий.
+
+    Снимок таблиц хранится в памяти процесса, а его актуальность
+    проверяется по версии в общем кэше Django при каждом обращении
+    (одно чтение из кэша): при изменении жанра или категории версия
+    меняется, и все воркеры перечитывают таблицы при следующем
+    обращении.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current_version():
+        version = cache.get(CATALOGUE_VERSION_KEY)
+        if version is None:
+            cache.add(CATALOGUE_VERSION_KEY, uuid.uuid4().hex, None)
+            return cache.get(CATALOGUE_VERSION_KEY)
+        return version
+
+    def invalidate(self):
+        cache.set(CATALOGUE_VERSION_KEY, uuid.uuid4().hex, None)
+        self._snapshot = None
+
+    def snapshot(self):
+        version = self.current_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = CatalogueSnapshot(
+                    version,
+                    list(Genre.objects.order_by('-id')),
+                    list(Category.objects.filter(
+                        is_hidden=False
+                    ).order_by('-id')),
+                )
+            return self._snapshot
+
+    def genre_by_slug(self, slug):
+        return self.snapshot().genres_by_slug.get(slug)
+
+    def category_by_slug(self, slug):
+        return self.snapshot().categories_by_slug.get(slug)
+
+    def genre_by_id(self, pk):
+        return self.snapshot().genres_by_id.get(pk)
+
+    def category_by_id(self, pk):
+        return self.snapshot().categories_by_id.get(pk)
+
+
+catalogue = Catalogue()
@@ -0,0 +1,29 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from reviews.models import Change
+
+Resource = Change.ResourceChoices
+Action = Change.ActionChoices
+
+KEY_FIELDS = ('object_id', 'title_id', 'review_id')
+
+
+def record_changes(resource, keys, action=Action.UPSERT):
+    """Записывает изменения одной вставкой. ``keys`` — кортежи
+    ``(id[, title_id[, review_id]])``: отзывам и комментариям нужны
+    id родителей, чтобы зеркало могло построить адрес объекта."""
+    Change.objects.bulk_create([
+        Change(resource=resource, action=action,
+               **dict(zip(KEY_FIELDS, key)))
+        for key in keys
+    ])
+
+
+def prune_changes(days=None):
+    """Удаляет записи старше срока хранения курсоров."""
+    days = days or settings.CHANGES_RETENTION_DAYS
+    border = timezone.now() - datetime.timedelta(days=days)
+    deleted, _ = Change.objects.filter(changed_at__lt=border).delete()
+    return deleted
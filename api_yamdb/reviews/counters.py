@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from reviews.models import Comment, Review, Title
+
+COUNTERS = (
+    (Title, 'reviews_count', Review, 'title'),
+    (Review, 'comments_count', Comment, 'review'),
+)
+
+
+def count_related(model, field):
+    """Число строк ``model``, ссылающихся через ``field`` на строку
+    внешнего запроса."""
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(count=Count('pk')).values('count')
+    ), 0)
+
+
+@transaction.atomic
+def reconcile_counters():
+    """Сверяет счётчики с фактическим числом отзывов и комментариев
+    и исправляет расхождения. Возвращает ``{модель: [pk]}``
+    исправленных строк."""
+    fixed = {}
+    for model, counter, related, field in COUNTERS:
+        stale = list(model.objects.annotate(
+            actual=count_related(related, field)
+        ).exclude(**{counter: F('actual')}).values_list('pk', flat=True))
+        if stale:
+            model.objects.filter(pk__in=stale).update(
+                **{counter: count_related(related, field)}
+            )
+        fixed[model] = stale
+    return fixed
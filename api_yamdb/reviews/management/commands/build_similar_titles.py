@@ -0,0 +1,26 @@
+from django.core.management import BaseCommand
+from reviews.recommendations import build_neighbours, refresh_stale_neighbours
+
+
+class Command(BaseCommand):
+    help = 'Computing similar titles from the co-review score matrix'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale',
+            action='store_true',
+            help="recalculate only titles whose reviews changed"
+        )
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            default=500,
+            help="number of matrix rows multiplied at once"
+        )
+
+    def handle(self, *args, **options):
+        if options['stale']:
+            count = refresh_stale_neighbours()
+        else:
+            count = build_neighbours(options['chunk_size'])
+        self.stdout.write(f'Calculated similar titles for {count} titles')
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+from reviews.activity import compact_activity, refresh_trending
+
+
+class Command(BaseCommand):
+    help = 'Compacting title activity counters and refreshing trending'
+
+    def handle(self, *args, **options):
+        removed = compact_activity()
+        for window in settings.TRENDING_WINDOWS:
+            refresh_trending(window)
+        self.stdout.write(f'Compacted activity counters, removed {removed}')
@@ -0,0 +1,17 @@
+from django.core.management import BaseCommand
+from reviews.changes import prune_changes
+
+
+class Command(BaseCommand):
+    help = 'Removing change feed records older than cursor retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help="retention in days (CHANGES_RETENTION_DAYS by default)"
+        )
+
+    def handle(self, *args, **options):
+        removed = prune_changes(options['days'])
+        self.stdout.write(f'Removed {removed} change records')
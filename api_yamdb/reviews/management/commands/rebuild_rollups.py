@@ -0,0 +1,10 @@
+from django.core.management import BaseCommand
+from reviews.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuilding leaderboard and analytics rollup tables'
+
+    def handle(self, *args, **options):
+        rebuild_rollups()
+        self.stdout.write('Rebuilt rollup tables')
@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+from reviews.models import Title
+from reviews.stats import refresh_score_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuilding stored score histograms from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            default=500,
+            help="number of titles recalculated per query"
+        )
+
+    def handle(self, *args, **options):
+        pks = list(Title.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(pks), options['chunk_size']):
+            refresh_score_stats(*pks[start:start + options['chunk_size']])
+        self.stdout.write(f'Rebuilt score stats for {len(pks)} titles')
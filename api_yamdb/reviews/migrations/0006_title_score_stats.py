@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-19 10:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_deletion_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScoreStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_stats', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Число оценок')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('histogram', models.JSONField(default=list, verbose_name='Число оценок от 1 до 10')),
+                ('weighted', models.FloatField(db_index=True, default=0, verbose_name='Взвешенная оценка')),
+            ],
+            options={
+                'verbose_name': 'Статистика оценок',
+                'verbose_name_plural': 'Статистика оценок',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-19 10:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_score_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(db_index=True, verbose_name='Начало периода')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Число событий')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Активность',
+                'verbose_name_plural': 'Активность',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titleactivity',
+            constraint=models.UniqueConstraint(fields=('title', 'bucket'), name='unique_title_activity'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 3.2 on 2026-10-19 10:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_auto_20221219_1823'),
+        ('reviews', '0007_title_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorRollup',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='users.user', verbose_name='Пользователь')),
+                ('reviews_count', models.IntegerField(db_index=True, default=0, verbose_name='Число отзывов')),
+                ('comments_count', models.IntegerField(db_index=True, default=0, verbose_name='Число комментариев')),
+            ],
+            options={
+                'verbose_name': 'Активность пользователя',
+                'verbose_name_plural': 'Активность пользователей',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewRollup',
+            fields=[
+                ('review', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='reviews.review', verbose_name='Отзыв')),
+                ('comments_count', models.IntegerField(db_index=True, default=0, verbose_name='Число комментариев')),
+            ],
+            options={
+                'verbose_name': 'Обсуждение отзыва',
+                'verbose_name_plural': 'Обсуждения отзывов',
+            },
+        ),
+        migrations.CreateModel(
+            name='ScoreRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('genre', 'Genre'), ('category', 'Category'), ('year', 'Year')], max_length=20, verbose_name='Разрез')),
+                ('key', models.IntegerField(verbose_name='id жанра, категории или год')),
+                ('count', models.IntegerField(default=0, verbose_name='Число оценок')),
+                ('total', models.IntegerField(default=0, verbose_name='Сумма оценок')),
+            ],
+            options={
+                'verbose_name': 'Оценки по разрезу',
+                'verbose_name_plural': 'Оценки по разрезам',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scorerollup',
+            constraint=models.UniqueConstraint(fields=('dimension', 'key'), name='unique_score_rollup'),
+        ),
+    ]
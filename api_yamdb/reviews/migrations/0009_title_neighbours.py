@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-19 11:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleNeighbours',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='neighbours', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('neighbours', models.JSONField(default=list, verbose_name='Похожие произведения')),
+                ('stale', models.BooleanField(db_index=True, default=False, verbose_name='Требует пересчёта')),
+            ],
+            options={
+                'verbose_name': 'Похожие произведения',
+                'verbose_name_plural': 'Похожие произведения',
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2 on 2026-10-19 11:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_score_counts(apps, schema_editor):
+    TitleScoreStats = apps.get_model('reviews', 'TitleScoreStats')
+    TitleScoreCount = apps.get_model('reviews', 'TitleScoreCount')
+    TitleScoreCount.objects.bulk_create([
+        TitleScoreCount(title_id=title_id, score=score, count=count)
+        for title_id, histogram in TitleScoreStats.objects.values_list(
+            'title_id', 'histogram'
+        ).iterator()
+        for score, count in enumerate(histogram or (), start=1)
+        if count
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScoreCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='Оценка')),
+                ('count', models.IntegerField(default=0, verbose_name='Число оценок')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_counts', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Число оценок',
+                'verbose_name_plural': 'Число оценок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlescorecount',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='unique_title_score_count'),
+        ),
+        migrations.RunPython(fill_score_counts, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='titlescorestats',
+            name='histogram',
+        ),
+    ]
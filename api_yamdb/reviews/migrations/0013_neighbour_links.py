@@ -0,0 +1,46 @@
+# Generated by Django 3.2 on 2026-10-19 11:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_neighbour_links(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleNeighbours = apps.get_model('reviews', 'TitleNeighbours')
+    NeighbourLink = apps.get_model('reviews', 'NeighbourLink')
+    existing = set(Title.objects.values_list('pk', flat=True))
+    NeighbourLink.objects.bulk_create([
+        NeighbourLink(title_id=title_id, neighbour_id=entry[0])
+        for title_id, neighbours in TitleNeighbours.objects.values_list(
+            'title_id', 'neighbours'
+        ).iterator()
+        for entry in neighbours or ()
+        if entry[0] in existing
+    ], batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_score_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NeighbourLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.title', verbose_name='Похожее произведение')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_links', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Упоминание в похожих',
+                'verbose_name_plural': 'Упоминания в похожих',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='neighbourlink',
+            constraint=models.UniqueConstraint(fields=('neighbour', 'title'), name='unique_neighbour_link'),
+        ),
+        migrations.RunPython(fill_neighbour_links, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,32 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 from reviews.validators import validate_year
 from users.models import User
 
 
+class CountersModel(models.Model):
+    """Модель со счётчиками, которые меняются только через ``F()``.
+
+    Сохранение существующего объекта не записывает ``counter_fields``:
+    значения в памяти могли устареть, и запись затёрла бы
+    параллельные приращения.
+    """
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
 class Category(models.Model):
     name = models.CharField(
         blank=False,
@@ -17,6 +40,16 @@ class Category(models.Model):
         verbose_name="Slug категории",
         unique=True,
     )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name="Скрыта до удаления",
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения',
+    )
 
     class Meta:
         ordering = ['-id']
@@ -41,6 +74,12 @@ class Genre(models.Model):
         unique=True,
     )
 
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения',
+    )
+
     class Meta:
         ordering = ['-id']
         verbose_name = 'Жанр'
@@ -50,7 +89,9 @@ class Genre(models.Model):
         return self.name
 
 
-class Title(models.Model):
+class Title(CountersModel):
+    counter_fields = ('reviews_count',)
+
     category = models.ForeignKey(
         Category,
         blank=True,
@@ -79,6 +120,20 @@ class Title(models.Model):
         verbose_name="Год выпуска",
         validators=[validate_year, ]
     )
+    reviews_count = models.IntegerField(
+        default=0,
+        verbose_name="Число отзывов",
+    )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name="Скрыто до удаления",
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения',
+    )
 
     class Meta:
         verbose_name = 'Произведение'
@@ -106,7 +161,9 @@ class TitleGenre(models.Model):
         return f'{self.title} {self.genre}'
 
 
-class Review(models.Model):
+class Review(CountersModel):
+    counter_fields = ('comments_count',)
+
     author = models.ForeignKey(
         User,
         verbose_name='Автор',
@@ -133,6 +190,16 @@ class Review(models.Model):
             MaxValueValidator(10, 'Разрешены значения от 1 до 10')
         ]
     )
+    comments_count = models.IntegerField(
+        default=0,
+        verbose_name='Число комментариев',
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения',
+    )
 
     class Meta:
         verbose_name = 'Отзыв'
@@ -170,6 +237,12 @@ class Comment(models.Model):
         auto_now_add=True,
     )
 
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения',
+    )
+
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
@@ -177,3 +250,351 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.text
+
+
+class TitleScoreStats(models.Model):
+    """Число и сумма оценок произведения, обновляются при записи
+    отзывов. ``weighted`` — байесовская оценка для рейтинга."""
+    title = models.OneToOneField(
+        Title,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='score_stats',
+        verbose_name='Произведение',
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число оценок',
+    )
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок',
+    )
+    weighted = models.FloatField(
+        default=0,
+        db_index=True,
+        verbose_name='Взвешенная оценка',
+    )
+
+    class Meta:
+        verbose_name = 'Статистика оценок'
+        verbose_name_plural = 'Статистика оценок'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.weighted:.2f}'
+
+
+class TitleScoreCount(models.Model):
+    """Число оценок ``score`` у произведения: строка гистограммы,
+    которую запись отзыва меняет через ``F()``."""
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='score_counts',
+        verbose_name='Произведение',
+    )
+    score = models.PositiveSmallIntegerField(
+        verbose_name='Оценка',
+    )
+    count = models.IntegerField(
+        default=0,
+        verbose_name='Число оценок',
+    )
+
+    class Meta:
+        verbose_name = 'Число оценок'
+        verbose_name_plural = 'Число оценок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_title_score_count'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.title_id} [{self.score}]: {self.count}'
+
+
+class TitleActivity(models.Model):
+    """Число новых отзывов и комментариев к произведению за час.
+    Старые часовые счётчики сжимаются в дневные."""
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='activity',
+        verbose_name='Произведение',
+    )
+    bucket = models.DateTimeField(
+        db_index=True,
+        verbose_name='Начало периода',
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число событий',
+    )
+
+    class Meta:
+        verbose_name = 'Активность'
+        verbose_name_plural = 'Активность'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'bucket'],
+                name='unique_title_activity'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.title_id} {self.bucket}: {self.count}'
+
+
+class AuthorRollup(models.Model):
+    """Число отзывов и комментариев пользователя."""
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='rollup',
+        verbose_name='Пользователь',
+    )
+    reviews_count = models.IntegerField(
+        default=0,
+        db_index=True,
+        verbose_name='Число отзывов',
+    )
+    comments_count = models.IntegerField(
+        default=0,
+        db_index=True,
+        verbose_name='Число комментариев',
+    )
+
+    class Meta:
+        verbose_name = 'Активность пользователя'
+        verbose_name_plural = 'Активность пользователей'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.reviews_count}/{self.comments_count}'
+
+
+class ReviewRollup(models.Model):
+    """Число комментариев к отзыву."""
+    review = models.OneToOneField(
+        Review,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='rollup',
+        verbose_name='Отзыв',
+    )
+    comments_count = models.IntegerField(
+        default=0,
+        db_index=True,
+        verbose_name='Число комментариев',
+    )
+
+    class Meta:
+        verbose_name = 'Обсуждение отзыва'
+        verbose_name_plural = 'Обсуждения отзывов'
+
+    def __str__(self):
+        return f'{self.review_id}: {self.comments_count}'
+
+
+class ScoreRollup(models.Model):
+    """Число и сумма оценок по жанру, категории или году выпуска."""
+    class DimensionChoices(models.TextChoices):
+        GENRE = 'genre'
+        CATEGORY = 'category'
+        YEAR = 'year'
+
+    dimension = models.CharField(
+        max_length=20,
+        choices=DimensionChoices.choices,
+        verbose_name='Разрез',
+    )
+    key = models.IntegerField(
+        verbose_name='id жанра, категории или год',
+    )
+    count = models.IntegerField(
+        default=0,
+        verbose_name='Число оценок',
+    )
+    total = models.IntegerField(
+        default=0,
+        verbose_name='Сумма оценок',
+    )
+
+    class Meta:
+        verbose_name = 'Оценки по разрезу'
+        verbose_name_plural = 'Оценки по разрезам'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dimension', 'key'],
+                name='unique_score_rollup'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.dimension} {self.key}: {self.count}'
+
+
+class TitleNeighbours(models.Model):
+    """Похожие произведения: список пар ``[id, сходство]`` по убыванию
+    сходства. ``stale`` отмечает произведения, чьи оценки изменились
+    после расчёта."""
+    title = models.OneToOneField(
+        Title,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='neighbours',
+        verbose_name='Произведение',
+    )
+    neighbours = models.JSONField(
+        default=list,
+        verbose_name='Похожие произведения',
+    )
+    stale = models.BooleanField(
+        default=False,
+        db_index=True,
+        verbose_name='Требует пересчёта',
+    )
+
+    class Meta:
+        verbose_name = 'Похожие произведения'
+        verbose_name_plural = 'Похожие произведения'
+
+    def __str__(self):
+        return f'{self.title_id}: {len(self.neighbours)}'
+
+
+class NeighbourLink(models.Model):
+    """Обратный индекс списков соседей: ``title`` упоминает
+    ``neighbour`` в своём списке."""
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='neighbour_links',
+        verbose_name='Произведение',
+    )
+    neighbour = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Похожее произведение',
+    )
+
+    class Meta:
+        verbose_name = 'Упоминание в похожих'
+        verbose_name_plural = 'Упоминания в похожих'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['neighbour', 'title'],
+                name='unique_neighbour_link'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.title_id} -> {self.neighbour_id}'
+
+
+class DeletionTask(models.Model):
+    """Фоновое удаление объекта вместе с зависимыми записями."""
+    class TargetChoices(models.TextChoices):
+        TITLE = 'title'
+        USER = 'user'
+        CATEGORY = 'category'
+
+    class StatusChoices(models.TextChoices):
+        PENDING = 'pending'
+        RUNNING = 'running'
+        DONE = 'done'
+        FAILED = 'failed'
+
+    target = models.CharField(
+        max_length=20,
+        choices=TargetChoices.choices,
+        verbose_name='Тип объекта',
+    )
+    object_id = models.PositiveIntegerField(
+        verbose_name='id объекта',
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+        verbose_name='Статус',
+    )
+    processed = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Обработано записей',
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создана',
+    )
+    finished = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершена',
+    )
+
+    class Meta:
+        verbose_name = 'Фоновое удаление'
+        verbose_name_plural = 'Фоновые удаления'
+        ordering = ['-id']
+
+    def __str__(self):
+        return f'{self.target} {self.object_id}: {self.status}'
+
+
+class Change(models.Model):
+    """Запись журнала изменений для синхронизации зеркал."""
+    class ResourceChoices(models.TextChoices):
+        TITLE = 'title'
+        GENRE = 'genre'
+        CATEGORY = 'category'
+        REVIEW = 'review'
+        COMMENT = 'comment'
+
+    class ActionChoices(models.TextChoices):
+        UPSERT = 'upsert'
+        DELETE = 'delete'
+
+    resource = models.CharField(
+        max_length=20,
+        choices=ResourceChoices.choices,
+        verbose_name='Тип объекта',
+    )
+    object_id = models.BigIntegerField(
+        verbose_name='id объекта',
+    )
+    title_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='id произведения отзыва или комментария',
+    )
+    review_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='id отзыва комментария',
+    )
+    action = models.CharField(
+        max_length=20,
+        choices=ActionChoices.choices,
+        verbose_name='Действие',
+    )
+    changed_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name='Время изменения',
+    )
+
+    class Meta:
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ['id']
+
+    def __str__(self):
+        return f'{self.action} {self.resource} {self.object_id}'
@@ -0,0 +1,193 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from reviews.models import NeighbourLink, Review, Title, TitleNeighbours
+from scipy import sparse
+
+
+def high_reviews():
+    return Review.objects.filter(score__gte=settings.SIMILAR_MIN_SCORE)
+
+
+def score_matrix(rows):
+    """Разреженная матрица «произведение × автор» из кортежей
+    ``(title_id, author_id, score)``. Возвращает id произведений
+    в порядке строк и саму матрицу."""
+    rows = np.array(list(rows), dtype=np.int64).reshape(-1, 3)
+    title_ids, title_index = np.unique(rows[:, 0], return_inverse=True)
+    author_ids, author_index = np.unique(rows[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (rows[:, 2].astype(np.float64), (title_index, author_index)),
+        shape=(len(title_ids), len(author_ids))
+    )
+    return title_ids, matrix
+
+
+def row_norms(matrix):
+    return np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1))).ravel()
+
+
+def cosine(rows, matrix, rows_norms, norms):
+    """Косинусное сходство строк ``rows`` со всеми строками
+    ``matrix`` одним умножением разреженных матриц."""
+    similarity = sparse.csr_matrix(rows @ matrix.T)
+    similarity = similarity.multiply(1 / rows_norms[:, None])
+    return sparse.csr_matrix(similarity.multiply(1 / norms[None, :]))
+
+
+def row_scores(similarity, row, title_ids, own_id):
+    start, end = similarity.indptr[row], similarity.indptr[row + 1]
+    ids = title_ids[similarity.indices[start:end]]
+    scores = similarity.data[start:end]
+    keep = (ids != own_id) & (scores > 0)
+    return ids[keep], scores[keep]
+
+
+def top_k(ids, scores, k):
+    if len(scores) > k:
+        part = np.argpartition(-scores, k)[:k]
+        ids, scores = ids[part], scores[part]
+    order = np.lexsort((ids, -scores))
+    return [[int(pk), round(float(score), 4)]
+            for pk, score in zip(ids[order], scores[order])]
+
+
+def neighbour_links(lists):
+    """Строки обратного индекса для списков ``{title_id: список}``."""
+    return [
+        NeighbourLink(title_id=pk, neighbour_id=entry[0])
+        for pk, neighbours in lists.items()
+        for entry in neighbours
+    ]
+
+
+def existing_lists(lists):
+    """Оставляет списки и соседей только существующих произведений:
+    произведение могло быть удалено, пока шёл расчёт."""
+    existing = set(Title.objects.filter(pk__in={
+        *lists, *(entry[0] for neighbours in lists.values()
+                  for entry in neighbours)
+    }).values_list('pk', flat=True))
+    return {
+        pk: [entry for entry in neighbours if entry[0] in existing]
+        for pk, neighbours in lists.items() if pk in existing
+    }
+
+
+@transaction.atomic
+def build_neighbours(chunk_size=500):
+    """Полный пересчёт похожих произведений для всего каталога.
+    Сходство считается блоками по ``chunk_size`` строк."""
+    k = settings.SIMILAR_TITLES_COUNT
+    title_ids, matrix = score_matrix(
+        high_reviews().values_list('title_id', 'author_id', 'score')
+    )
+    norms = row_norms(matrix)
+    neighbours = {}
+    for start in range(0, len(title_ids), chunk_size):
+        similarity = cosine(matrix[start:start + chunk_size], matrix,
+                            norms[start:start + chunk_size], norms)
+        for row in range(similarity.shape[0]):
+            own_id = title_ids[start + row]
+            neighbours[int(own_id)] = top_k(
+                *row_scores(similarity, row, title_ids, own_id), k
+            )
+    lists = existing_lists({
+        pk: neighbours.get(pk, [])
+        for pk in Title.objects.values_list('pk', flat=True)
+    })
+    TitleNeighbours.objects.all().delete()
+    NeighbourLink.objects.all().delete()
+    TitleNeighbours.objects.bulk_create([
+        TitleNeighbours(title_id=pk, neighbours=neighbours)
+        for pk, neighbours in lists.items()
+    ])
+    NeighbourLink.objects.bulk_create(neighbour_links(lists))
+    return len(neighbours)
+
+
+def neighbour_rows(pks, chunk_size=500):
+    """Полные списки соседей произведений ``pks``. Матрица строится
+    только по авторам, высоко оценившим эти произведения, нормы
+    строк — по всем отзывам одним запросом."""
+    k = settings.SIMILAR_TITLES_COUNT
+    neighbours = {pk: [] for pk in pks}
+    authors = high_reviews().filter(title_id__in=pks).values('author_id')
+    title_ids, matrix = score_matrix(high_reviews().filter(
+        author_id__in=authors
+    ).values_list('title_id', 'author_id', 'score'))
+    squares = dict(high_reviews().filter(
+        title_id__in=title_ids.tolist()
+    ).order_by().values_list('title_id').annotate(
+        square=Sum(F('score') * F('score'))
+    ))
+    norms = np.sqrt(np.array([squares[pk] for pk in title_ids.tolist()],
+                             dtype=np.float64))
+    rows = np.flatnonzero(np.isin(title_ids, list(pks)))
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        similarity = cosine(matrix[chunk], matrix, norms[chunk], norms)
+        for row, index in enumerate(chunk):
+            own_id = title_ids[index]
+            neighbours[int(own_id)] = top_k(
+                *row_scores(similarity, row, title_ids, own_id), k
+            )
+    return neighbours
+
+
+def affected_titles(stale):
+    """Произведения, чьи списки соседей могут измениться вместе
+    с ``stale``: оценённые теми же авторами сейчас и упоминающие
+    ``stale`` в сохранённых списках (с ними сходство могло
+    пропасть; находятся по обратному индексу)."""
+    authors = high_reviews().filter(title_id__in=stale).values('author_id')
+    affected = set(high_reviews().filter(
+        author_id__in=authors
+    ).values_list('title_id', flat=True).distinct())
+    affected.update(NeighbourLink.objects.filter(
+        neighbour_id__in=stale
+    ).values_list('title_id', flat=True))
+    return affected | stale
+
+
+@transaction.atomic
+def refresh_stale_neighbours():
+    """Пересчитывает целиком списки соседей произведений
+    с изменившимися оценками и всех произведений, чьи списки от них
+    зависят, и заменяет сохранённые списки."""
+    stale = set(TitleNeighbours.objects.select_for_update().filter(
+        stale=True
+    ).values_list('title_id', flat=True))
+    if not stale:
+        return 0
+    fresh = existing_lists(neighbour_rows(affected_titles(stale)))
+    existing = set(TitleNeighbours.objects.filter(
+        title_id__in=fresh
+    ).values_list('title_id', flat=True))
+    TitleNeighbours.objects.bulk_update([
+        TitleNeighbours(title_id=pk, neighbours=fresh[pk], stale=False)
+        for pk in existing
+    ], ['neighbours', 'stale'])
+    TitleNeighbours.objects.bulk_create([
+        TitleNeighbours(title_id=pk, neighbours=fresh[pk])
+        for pk in set(fresh) - existing
+    ])
+    NeighbourLink.objects.filter(title_id__in=fresh).delete()
+    NeighbourLink.objects.bulk_create(neighbour_links(fresh))
+    return len(stale)
+
+
+def mark_neighbours_stale(*title_ids):
+    """Отмечает произведения для пересчёта соседей."""
+    title_ids = set(title_ids)
+    marked = set(TitleNeighbours.objects.filter(
+        title_id__in=title_ids
+    ).values_list('title_id', flat=True))
+    TitleNeighbours.objects.filter(title_id__in=marked).update(stale=True)
+    TitleNeighbours.objects.bulk_create([
+        TitleNeighbours(title_id=pk, stale=True)
+        for pk in Title.objects.filter(
+            pk__in=title_ids - marked
+        ).values_list('pk', flat=True)
+    ], ignore_conflicts=True)
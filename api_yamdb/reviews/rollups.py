@@ -0,0 +1,193 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from reviews.models import (AuthorRollup, Comment, Review, ReviewRollup,
+                            ScoreRollup, Title, TitleGenre, TitleScoreStats)
+
+Dimension = ScoreRollup.DimensionChoices
+
+
+def increment(model, lookup, **deltas):
+    """Прибавляет ``deltas`` к строке ``lookup``. Отсутствующая строка
+    создаётся, только если все изменения положительные: уменьшать
+    несуществующий счётчик незачем, его восстановит пересчёт."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    rows = model.objects.filter(**lookup)
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if rows.update(**changes) or min(deltas.values()) < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        rows.update(**changes)
+
+
+def adjust_counters(model, field, deltas):
+    """Прибавляет к счётчику ``field`` строк ``deltas`` (``{pk:
+    изменение}``) через ``F()``, одним UPDATE на каждое значение
+    изменения: параллельные записи не теряют друг друга."""
+    pks = {}
+    for pk, delta in deltas.items():
+        if delta:
+            pks.setdefault(delta, []).append(pk)
+    for delta, group in pks.items():
+        model.objects.filter(pk__in=group).update(**{field: F(field) + delta})
+
+
+def own_dimensions(category_id, year):
+    """Разрезы произведения без жанров."""
+    dimensions = [(Dimension.YEAR, year)]
+    if category_id is not None:
+        dimensions.append((Dimension.CATEGORY, category_id))
+    return dimensions
+
+
+def title_dimensions(title_ids):
+    """Разрезы ``(dimension, key)`` каждого произведения."""
+    titles = Title.objects.filter(
+        pk__in=title_ids
+    ).values_list('pk', 'category_id', 'year')
+    dimensions = {
+        pk: own_dimensions(category_id, year)
+        for pk, category_id, year in titles
+    }
+    links = TitleGenre.objects.filter(
+        title_id__in=dimensions
+    ).values_list('title_id', 'genre_id')
+    for title_id, genre_id in links:
+        dimensions[title_id].append((Dimension.GENRE, genre_id))
+    return dimensions
+
+
+def apply_review_deltas(rows, sign=1):
+    """Учитывает отзывы в сводных таблицах и счётчиках отзывов
+    произведений. ``rows`` — кортежи ``(author_id, title_id, число
+    отзывов, сумма оценок)``."""
+    rows = list(rows)
+    authors, titles, scores = {}, {}, {}
+    dimensions = title_dimensions({title_id for _, title_id, _, _ in rows})
+    for author_id, title_id, count, total in rows:
+        authors[author_id] = authors.get(author_id, 0) + count
+        titles[title_id] = titles.get(title_id, 0) + sign * count
+        for key in dimensions.get(title_id, ()):
+            stored = scores.get(key, (0, 0))
+            scores[key] = (stored[0] + count, stored[1] + total)
+    for author_id, count in authors.items():
+        increment(AuthorRollup, {'user_id': author_id},
+                  reviews_count=sign * count)
+    for (dimension, key), (count, total) in scores.items():
+        increment(ScoreRollup, {'dimension': dimension, 'key': key},
+                  count=sign * count, total=sign * total)
+    adjust_counters(Title, 'reviews_count', titles)
+
+
+def move_titles(before, after):
+    """Переносит оценки произведений из разрезов ``before`` в разрезы
+    ``after`` (``{title_id: [(dimension, key)]}`` до и после
+    изменения): из старого ключа вычитаются число и сумма оценок
+    произведения, к новому — прибавляются."""
+    stats = TitleScoreStats.objects.filter(
+        title_id__in={*before, *after}, count__gt=0
+    ).values_list('title_id', 'count', 'total')
+    scores = {}
+    for title_id, count, total in stats:
+        old = set(before.get(title_id, ()))
+        new = set(after.get(title_id, ()))
+        for sign, keys in ((-1, old - new), (1, new - old)):
+            for key in keys:
+                stored = scores.get(key, (0, 0))
+                scores[key] = (stored[0] + sign * count,
+                               stored[1] + sign * total)
+    for (dimension, key), (count, total) in scores.items():
+        increment(ScoreRollup, {'dimension': dimension, 'key': key},
+                  count=count, total=total)
+
+
+def genre_dimensions(links):
+    """Разрезы по жанрам из пар ``(title_id, genre_id)``."""
+    dimensions = {}
+    for title_id, genre_id in links:
+        dimensions.setdefault(title_id, []).append(
+            (Dimension.GENRE, genre_id)
+        )
+    return dimensions
+
+
+def apply_comment_deltas(rows, sign=1):
+    """Учитывает комментарии в сводных таблицах и счётчиках
+    комментариев отзывов. ``rows`` — кортежи ``(author_id, review_id,
+    число комментариев)``."""
+    authors, reviews = {}, {}
+    for author_id, review_id, count in rows:
+        authors[author_id] = authors.get(author_id, 0) + count
+        reviews[review_id] = reviews.get(review_id, 0) + count
+    for author_id, count in authors.items():
+        increment(AuthorRollup, {'user_id': author_id},
+                  comments_count=sign * count)
+    for review_id, count in reviews.items():
+        increment(ReviewRollup, {'review_id': review_id},
+                  comments_count=sign * count)
+    adjust_counters(Review, 'comments_count', {
+        review_id: sign * count for review_id, count in reviews.items()
+    })
+
+
+def review_rows(queryset):
+    return queryset.order_by().values_list(
+        'author_id', 'title_id'
+    ).annotate(count=Count('id'), total=Sum('score'))
+
+
+def comment_rows(queryset):
+    return queryset.order_by().values_list(
+        'author_id', 'review_id'
+    ).annotate(count=Count('id'))
+
+
+def reviews_removed(queryset):
+    apply_review_deltas(review_rows(queryset), -1)
+
+
+def comments_removed(queryset):
+    apply_comment_deltas(comment_rows(queryset), -1)
+
+
+@transaction.atomic
+def rebuild_rollups():
+    """Пересчитывает сводные таблицы по отзывам и комментариям."""
+    AuthorRollup.objects.all().delete()
+    ReviewRollup.objects.all().delete()
+    ScoreRollup.objects.all().delete()
+    authors = {}
+    for author_id, count in Review.objects.order_by().values_list(
+            'author_id').annotate(count=Count('id')):
+        authors[author_id] = AuthorRollup(user_id=author_id,
+                                          reviews_count=count)
+    reviews = []
+    for author_id, review_id, count in comment_rows(Comment.objects.all()):
+        authors.setdefault(author_id, AuthorRollup(user_id=author_id))
+        authors[author_id].comments_count += count
+        reviews.append((review_id, count))
+    AuthorRollup.objects.bulk_create(authors.values())
+    totals = {}
+    for review_id, count in reviews:
+        totals[review_id] = totals.get(review_id, 0) + count
+    ReviewRollup.objects.bulk_create([
+        ReviewRollup(review_id=review_id, comments_count=count)
+        for review_id, count in totals.items()
+    ])
+    ScoreRollup.objects.bulk_create([
+        ScoreRollup(dimension=dimension, key=key, count=count, total=total)
+        for dimension, lookup in (
+            (Dimension.GENRE, 'title__titlegenre__genre_id'),
+            (Dimension.CATEGORY, 'title__category_id'),
+            (Dimension.YEAR, 'title__year'),
+        )
+        for key, count, total in Review.objects.filter(**{
+            f'{lookup}__isnull': False
+        }).order_by().values_list(lookup).annotate(
+            count=Count('id'), total=Sum('score')
+        )
+    ])
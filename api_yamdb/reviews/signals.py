@@ -0,0 +1,140 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+from reviews.activity import record_activity
+from reviews.catalogue import catalogue
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.recommendations import mark_neighbours_stale
+from reviews.rollups import (apply_comment_deltas, apply_review_deltas,
+                             genre_dimensions, move_titles, own_dimensions)
+from reviews.stats import apply_score_deltas
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalogue(sender, **kwargs):
+    transaction.on_commit(catalogue.invalidate)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def count_activity(sender, instance, created, **kwargs):
+    if not created:
+        return
+    if sender is Comment:
+        record_activity(instance.review.title_id)
+    else:
+        record_activity(instance.title_id)
+
+
+@receiver(pre_save, sender=Review)
+def remember_score(sender, instance, **kwargs):
+    instance._previous_score = None
+    if instance.pk is not None:
+        instance._previous_score = Review.objects.filter(
+            pk=instance.pk
+        ).values_list('score', flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def count_review(sender, instance, created, **kwargs):
+    if created or instance._previous_score is None:
+        count, total = 1, instance.score
+    else:
+        count, total = 0, instance.score - instance._previous_score
+    apply_review_deltas(
+        [(instance.author_id, instance.title_id, count, total)]
+    )
+    scores = [(instance.title_id, instance.score, 1)]
+    if not created and instance._previous_score is not None:
+        scores.append((instance.title_id, instance._previous_score, -1))
+    apply_score_deltas(scores)
+
+
+@receiver(pre_delete, sender=Review)
+def uncount_review(sender, instance, **kwargs):
+    """Срабатывает до каскадного удаления, пока жанры и категория
+    произведения ещё доступны."""
+    apply_review_deltas(
+        [(instance.author_id, instance.title_id, 1, instance.score)], -1
+    )
+    apply_score_deltas([(instance.title_id, instance.score, 1)], -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    if created:
+        apply_comment_deltas([(instance.author_id, instance.review_id, 1)])
+
+
+@receiver(pre_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    apply_comment_deltas([(instance.author_id, instance.review_id, 1)], -1)
+
+
+@receiver(pre_save, sender=Title)
+def remember_dimensions(sender, instance, update_fields=None, **kwargs):
+    instance._previous_dimensions = None
+    if instance.pk is None or (
+            update_fields is not None
+            and not {'category', 'category_id', 'year'} & set(update_fields)):
+        return
+    row = Title.objects.filter(
+        pk=instance.pk
+    ).values_list('category_id', 'year').first()
+    if row is not None:
+        instance._previous_dimensions = own_dimensions(*row)
+
+
+@receiver(post_save, sender=Title)
+def move_title_scores(sender, instance, **kwargs):
+    """Смена категории или года переносит оценки произведения в
+    сводной таблице из старого разреза в новый."""
+    previous = getattr(instance, '_previous_dimensions', None)
+    current = own_dimensions(instance.category_id, instance.year)
+    if previous is not None and previous != current:
+        move_titles({instance.pk: previous}, {instance.pk: current})
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def move_genre_scores(sender, instance, action, reverse, pk_set, **kwargs):
+    """Оценки учитываются в добавленных жанрах после вставки связей и
+    вычитаются из удаляемых до их удаления."""
+    if action == 'post_add':
+        links = [
+            (pk, instance.pk) if reverse else (instance.pk, pk)
+            for pk in pk_set
+        ]
+    elif action in ('pre_remove', 'pre_clear'):
+        links = TitleGenre.objects.filter(**{
+            'genre' if reverse else 'title': instance
+        })
+        if action == 'pre_remove':
+            links = links.filter(**{
+                'title_id__in' if reverse else 'genre_id__in': pk_set
+            })
+        links = links.values_list('title_id', 'genre_id')
+    else:
+        return
+    genres = genre_dimensions(links)
+    if action == 'post_add':
+        move_titles({}, genres)
+    else:
+        move_titles(genres, {})
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def outdate_neighbours(sender, instance, **kwargs):
+    """Соседей пересчитывает ``build_similar_titles --stale``; высокие
+    оценки входят в матрицу сходства, остальные на неё не влияют."""
+    scores = (instance.score, getattr(instance, '_previous_score', None))
+    if any(score is not None and score >= settings.SIMILAR_MIN_SCORE
+           for score in scores):
+        transaction.on_commit(
+            lambda: mark_neighbours_stale(instance.title_id)
+        )
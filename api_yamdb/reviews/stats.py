@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from reviews.models import Review, Title, TitleScoreCount, TitleScoreStats
+from reviews.rollups import increment
+
+SCORES = range(1, 11)
+
+
+def weighted_score(count, total):
+    """Байесовская оценка: среднее, сглаженное априорными
+    ``RATING_PRIOR_COUNT`` оценками ``RATING_PRIOR_MEAN``."""
+    prior_count = settings.RATING_PRIOR_COUNT
+    return ((prior_count * settings.RATING_PRIOR_MEAN + total)
+            / (prior_count + count))
+
+
+def weighted_expression(count, total):
+    """``weighted_score`` для строки, к которой в том же UPDATE
+    прибавляются ``count`` оценок с суммой ``total``."""
+    prior_count = settings.RATING_PRIOR_COUNT
+    return Case(
+        When(count__lte=-count, then=Value(0.0)),
+        default=(
+            (Value(float(prior_count * settings.RATING_PRIOR_MEAN))
+             + Cast(F('total'), FloatField()) + total)
+            / (Value(float(prior_count))
+               + Cast(F('count'), FloatField()) + count)
+        ),
+        output_field=FloatField(),
+    )
+
+
+def adjust_stats(title_id, count, total):
+    """Прибавляет к статистике произведения ``count`` оценок
+    с суммой ``total`` одним UPDATE через ``F()``."""
+    rows = TitleScoreStats.objects.filter(title_id=title_id)
+    changes = {
+        'count': F('count') + count,
+        'total': F('total') + total,
+        'weighted': weighted_expression(count, total),
+    }
+    if rows.update(**changes) or count <= 0:
+        return
+    try:
+        with transaction.atomic():
+            TitleScoreStats.objects.create(
+                title_id=title_id, count=count, total=total,
+                weighted=weighted_score(count, total)
+            )
+    except IntegrityError:
+        rows.update(**changes)
+
+
+def apply_score_deltas(rows, sign=1):
+    """Учитывает оценки в гистограммах и статистике произведений без
+    пересчёта по отзывам. ``rows`` — кортежи ``(title_id, оценка,
+    число отзывов)``."""
+    scores, titles = {}, {}
+    for title_id, score, count in rows:
+        count *= sign
+        scores[title_id, score] = scores.get((title_id, score), 0) + count
+        stored = titles.get(title_id, (0, 0))
+        titles[title_id] = (stored[0] + count, stored[1] + count * score)
+    for (title_id, score), count in scores.items():
+        increment(TitleScoreCount, {'title_id': title_id, 'score': score},
+                  count=count)
+    for title_id, (count, total) in titles.items():
+        if count or total:
+            adjust_stats(title_id, count, total)
+
+
+def scores_removed(queryset):
+    apply_score_deltas(queryset.order_by().values_list(
+        'title_id', 'score'
+    ).annotate(count=Count('id')), -1)
+
+
+def make_stats(title_id, histogram):
+    count = sum(histogram.values())
+    total = sum(score * n for score, n in histogram.items())
+    return TitleScoreStats(
+        title_id=title_id,
+        count=count,
+        total=total,
+        weighted=weighted_score(count, total) if count else 0,
+    )
+
+
+@transaction.atomic
+def refresh_score_stats(*title_ids):
+    """Полностью пересчитывает гистограммы и статистику оценок
+    указанных произведений по отзывам (команда
+    ``rebuild_score_stats``). При записи отзывов статистика
+    меняется через ``apply_score_deltas``."""
+    title_ids = set(Title.objects.filter(
+        pk__in=title_ids
+    ).select_for_update().order_by('pk').values_list('pk', flat=True))
+    histograms = {pk: {} for pk in title_ids}
+    rows = Review.objects.filter(
+        title_id__in=title_ids
+    ).order_by().values_list('title_id', 'score').annotate(n=Count('id'))
+    for title_id, score, n in rows:
+        histograms[title_id][score] = n
+    TitleScoreCount.objects.filter(title_id__in=title_ids).delete()
+    TitleScoreStats.objects.filter(title_id__in=title_ids).delete()
+    TitleScoreCount.objects.bulk_create([
+        TitleScoreCount(title_id=pk, score=score, count=n)
+        for pk, histogram in histograms.items()
+        for score, n in histogram.items()
+    ])
+    TitleScoreStats.objects.bulk_create([
+        make_stats(pk, histogram) for pk, histogram in histograms.items()
+    ])
+
+
+def title_histogram(title_id):
+    return dict(TitleScoreCount.objects.filter(
+        title_id=title_id, count__gt=0
+    ).values_list('score', 'count'))
+
+
+def represent_histogram(histogram):
+    return {str(score): histogram.get(score, 0) for score in SCORES}
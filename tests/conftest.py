@@ -1,9 +1,47 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Версии, фрагменты и снимок каталога не переживают тест."""
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def admin():
+    from users.models import User
+    return User.objects.create(username='admin', email='admin@yamdb.fake',
+                               role=User.RoleChoices.ADMIN)
+
+
+@pytest.fixture
+def author():
+    from users.models import User
+    return User.objects.create(username='author', email='author@yamdb.fake')
+
+
+@pytest.fixture
+def admin_api(admin):
+    from rest_framework.test import APIClient
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.fixture
+def title():
+    from reviews.models import Title
+    return Title.objects.create(name='Произведение', year=2000)
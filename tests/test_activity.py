@@ -0,0 +1,83 @@
+import datetime
+import time
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from reviews.activity import (compact_activity, rank_titles, trending_key,
+                              trending_titles)
+from reviews.models import Title, TitleActivity
+
+NOW = datetime.datetime(2026, 3, 10, 12, 30, tzinfo=timezone.utc)
+
+
+def hours_ago(hours):
+    return NOW.replace(minute=0) - datetime.timedelta(hours=hours)
+
+
+@pytest.mark.django_db
+class TestTrending:
+
+    @pytest.fixture
+    def titles(self):
+        return [Title.objects.create(name=f'Произведение {n}', year=2000)
+                for n in range(3)]
+
+    def add(self, title, bucket, count):
+        TitleActivity.objects.create(title=title, bucket=bucket, count=count)
+
+    def test_window_boundaries(self, titles):
+        first, second, third = titles
+        self.add(first, hours_ago(24), 1)
+        self.add(second, hours_ago(25), 5)
+        self.add(third, hours_ago(24 * 7 + 1), 9)
+        assert rank_titles('24h', NOW) == [first.pk], (
+            'Проверьте, что окно включает час, в который попадает его '
+            'начало, и не включает более ранние'
+        )
+        assert rank_titles('7d', NOW) == [second.pk, first.pk]
+
+    def test_order_and_hidden(self, titles):
+        first, second, third = titles
+        for title in titles:
+            self.add(title, hours_ago(1), 2)
+        self.add(first, hours_ago(2), 1)
+        Title.objects.filter(pk=third.pk).update(is_hidden=True)
+        assert rank_titles('24h', NOW) == [first.pk, second.pk], (
+            'Проверьте порядок по числу событий и скрытие произведений'
+        )
+
+    def test_compaction(self, titles, settings):
+        settings.ACTIVITY_HOURLY_RETENTION = 48
+        first, second, _ = titles
+        for hours in (1, 2, 72, 73, 80):
+            self.add(first, hours_ago(hours), 1)
+        self.add(second, hours_ago(24 * 7 + 30), 4)
+        before = rank_titles('7d', NOW)
+        removed = compact_activity(NOW)
+        buckets = dict(TitleActivity.objects.filter(
+            title=first
+        ).values_list('bucket', 'count'))
+        day = hours_ago(72).replace(hour=0)
+        assert buckets == {hours_ago(1): 1, hours_ago(2): 1, day: 3}, (
+            'Проверьте, что старые часовые счётчики сводятся в дневные'
+        )
+        assert not TitleActivity.objects.filter(title=second).exists(), (
+            'Проверьте, что счётчики старше самого длинного окна удаляются'
+        )
+        assert removed == 3
+        assert rank_titles('7d', NOW) == before
+
+    def test_single_refresh(self, titles, django_assert_num_queries):
+        key = trending_key('24h')
+        cache.set(key, (time.time() - 10 ** 6, [titles[0].pk]), None)
+        cache.add(f'{key}:lock', True)
+        with django_assert_num_queries(0):
+            assert trending_titles('24h') == [titles[0].pk], (
+                'Проверьте, что пока рейтинг пересчитывает другой воркер, '
+                'отдаётся прежний'
+            )
+        cache.delete(f'{key}:lock')
+        with django_assert_num_queries(1):
+            assert trending_titles('24h') == []
+        assert cache.get(f'{key}:lock') is None
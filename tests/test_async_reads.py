@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pytest
+from reviews.models import Review
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import User
+
+
+def asgi_get(application, path, query=b'', headers=()):
+    """Выполняет GET через ASGI-приложение и возвращает статус
+    и тело ответа."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path,
+        'query_string': query, 'headers': list(headers), 'scheme': 'http',
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+    }
+    asyncio.run(application(scope, receive, send))
+    return messages[0]['status'], b''.join(
+        message.get('body', b'') for message in messages[1:]
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestASGIReads:
+
+    @pytest.fixture
+    def reviews(self, title):
+        return [Review.objects.create(
+            title=title, text=f'Отзыв {n}', score=n + 1,
+            author=User.objects.create(username=f'reader{n}',
+                                       email=f'reader{n}@yamdb.fake')
+        ) for n in range(5)]
+
+    def test_ndjson_stream(self, admin, title, reviews):
+        from api_yamdb.asgi import application
+        token = str(AccessToken.for_user(admin)).encode()
+        status, body = asgi_get(
+            application, f'/api/v1/titles/{title.pk}/reviews/',
+            b'format=ndjson', [(b'authorization', b'Bearer ' + token)]
+        )
+        assert status == 200, (
+            'Проверьте, что выгрузка NDJSON работает под ASGI'
+        )
+        lines = [json.loads(line) for line in body.splitlines()]
+        assert sorted(line['id'] for line in lines) == sorted(
+            review.pk for review in reviews
+        ), 'Проверьте, что выгрузка под ASGI содержит все отзывы'
+
+    def test_list_same_as_wsgi(self, admin_api, title, reviews):
+        from api_yamdb.asgi import application
+        path = f'/api/v1/titles/{title.pk}/reviews/'
+        status, body = asgi_get(application, path)
+        assert status == 200
+        assert json.loads(body) == admin_api.get(path).json(), (
+            'Проверьте, что список под ASGI совпадает с ответом WSGI'
+        )
+
+    def test_ndjson_django_asgi(self, admin, title, reviews):
+        from django.core.asgi import get_asgi_application
+        token = str(AccessToken.for_user(admin)).encode()
+        status, body = asgi_get(
+            get_asgi_application(), f'/api/v1/titles/{title.pk}/reviews/',
+            b'format=ndjson', [(b'authorization', b'Bearer ' + token)]
+        )
+        assert status == 200, (
+            'Проверьте, что выгрузка NDJSON работает под обработчиком '
+            'ASGI самого Django'
+        )
+        assert len(body.splitlines()) == len(reviews), (
+            'Проверьте, что выгрузка под ASGI содержит все отзывы'
+        )
@@ -0,0 +1,59 @@
+import pytest
+from reviews.models import Genre
+
+BATCH_URL = '/api/v1/batch/'
+
+
+@pytest.mark.django_db
+class TestBatch:
+
+    def post(self, client, requests, atomic=False):
+        response = client.post(BATCH_URL, {
+            'requests': requests, 'atomic': atomic
+        }, format='json')
+        assert response.status_code == 200, (
+            'Проверьте, что ошибка подзапроса не ломает весь пакет'
+        )
+        return response.json()
+
+    def test_streaming_subrequest(self, admin_api, title):
+        results = self.post(admin_api, [
+            {'method': 'GET',
+             'path': f'/api/v1/titles/{title.pk}/reviews/?format=ndjson'},
+            {'method': 'GET', 'path': f'/api/v1/titles/{title.pk}/'},
+        ])
+        assert results[0]['status'] == 406, (
+            'Проверьте, что потоковый подзапрос получает ответ 406'
+        )
+        assert results[1]['status'] == 200
+        assert results[1]['body']['id'] == title.pk
+
+    def test_failing_subrequest(self, admin_api, monkeypatch):
+        def fail(*args, **kwargs):
+            raise RuntimeError('сбой')
+
+        monkeypatch.setattr('api.views.GenreViewSet.list', fail)
+        results = self.post(admin_api, [
+            {'method': 'GET', 'path': '/api/v1/genres/'},
+            {'method': 'GET', 'path': '/api/v1/categories/'},
+        ])
+        assert [result['status'] for result in results] == [500, 200], (
+            'Проверьте, что исключение подзапроса становится ответом 500 '
+            'этого элемента'
+        )
+
+    def test_failing_subrequest_atomic(self, admin_api, monkeypatch):
+        def fail(*args, **kwargs):
+            raise RuntimeError('сбой')
+
+        monkeypatch.setattr('api.views.CategoryViewSet.list', fail)
+        results = self.post(admin_api, [
+            {'method': 'POST', 'path': '/api/v1/genres/',
+             'body': {'name': 'Драма', 'slug': 'drama'}},
+            {'method': 'GET', 'path': '/api/v1/categories/'},
+            {'method': 'GET', 'path': '/api/v1/genres/'},
+        ], atomic=True)
+        assert [result['status'] for result in results] == [201, 500]
+        assert not Genre.objects.exists(), (
+            'Проверьте, что с atomic изменения откатываются после ошибки'
+        )
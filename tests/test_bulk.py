@@ -0,0 +1,69 @@
+import pytest
+from api.versions import versions
+from reviews.models import Category, Genre, Title
+
+BULK_URL = '/api/v1/titles/bulk/'
+
+
+@pytest.mark.django_db
+class TestBulkTitles:
+
+    @pytest.fixture(autouse=True)
+    def catalogue(self):
+        Category.objects.create(name='Фильмы', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+
+    def test_errors_per_item(self, admin_api, title):
+        items = [
+            {'name': 'Новое', 'year': 2001, 'category': 'movie',
+             'genre': ['drama']},
+            'не объект',
+            {'id': title.pk + 100, 'name': 'Нет такого'},
+            {'name': 'Без категории', 'year': 2002, 'genre': []},
+            {'id': title.pk, 'name': 'Переименовано'},
+        ]
+        response = admin_api.post(BULK_URL, items, format='json')
+        assert response.status_code == 200
+        results = response.json()
+        assert len(results) == len(items), (
+            'Проверьте, что ответ содержит результат для каждого элемента'
+        )
+        assert results[0]['created'] is True
+        assert results[1] == {'errors': {
+            'non_field_errors': ['Ожидался объект.']
+        }}
+        assert results[2] == {'errors': {'id': ['Произведение не найдено.']}}
+        assert 'category' in results[3]['errors']
+        assert results[4] == {'id': title.pk, 'created': False}
+        assert set(Title.objects.values_list('name', flat=True)) == {
+            'Новое', 'Переименовано'
+        }, 'Проверьте, что сохраняются только корректные элементы'
+        assert list(Title.objects.get(pk=results[0]['id']).genre.values_list(
+            'slug', flat=True
+        )) == ['drama']
+
+    @pytest.mark.parametrize('pk', [[1], {'id': 1}, 'abc', 0, None, 1.5])
+    def test_invalid_id(self, admin_api, title, pk):
+        response = admin_api.post(BULK_URL, [{'id': pk, 'name': 'Имя'}],
+                                  format='json')
+        assert response.status_code == 200
+        assert 'id' in response.json()[0]['errors'], (
+            'Проверьте, что некорректный id возвращает ошибку элемента'
+        )
+
+    def test_invalidates_after_commit(self, admin_api, title,
+                                      django_capture_on_commit_callbacks):
+        before = versions.get_many([('title', title.pk)])
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            admin_api.post(BULK_URL, [{'id': title.pk, 'name': 'Новое'}],
+                           format='json')
+        assert versions.get_many([('title', title.pk)]) == before, (
+            'Проверьте, что кэши сбрасываются только после фиксации'
+        )
+        for callback in callbacks:
+            callback()
+        assert versions.get_many([('title', title.pk)]) != before
+
+    def test_not_a_list(self, admin_api):
+        response = admin_api.post(BULK_URL, {'name': 'Одно'}, format='json')
+        assert response.status_code == 400
@@ -0,0 +1,44 @@
+import pytest
+from api.fragments import fragment_store
+from reviews.catalogue import Catalogue, catalogue
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCatalogue:
+
+    def test_other_process_invalidation(self):
+        worker, other = Catalogue(), Catalogue()
+        assert worker.genre_by_slug('drama') is None
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        other.invalidate()
+        assert worker.genre_by_slug('drama') == genre, (
+            'Проверьте, что снимок каталога обновляется сразу после '
+            'изменения версии в другом процессе'
+        )
+        Genre.objects.filter(pk=genre.pk).delete()
+        other.invalidate()
+        assert worker.genre_by_slug('drama') is None
+
+    def test_new_slug_accepted(self, admin_api):
+        catalogue.snapshot()
+        admin_api.post('/api/v1/categories/',
+                       {'name': 'Книги', 'slug': 'books'}, format='json')
+        response = admin_api.post('/api/v1/titles/', {
+            'name': 'Новая книга', 'year': 2001, 'category': 'books',
+            'genre': []
+        }, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что только что созданная категория сразу доступна'
+        )
+
+    def test_fragment_after_rename(self, title):
+        category = Category.objects.create(name='Книги', slug='books')
+        Title.objects.filter(pk=title.pk).update(category=category)
+        assert '"Книги"'.encode() in fragment_store.get(title.pk)
+        category.name = 'Романы'
+        category.save()
+        assert '"Романы"'.encode() in fragment_store.get(title.pk), (
+            'Проверьте, что фрагмент перерисовывается по новой версии '
+            'каталога'
+        )
@@ -0,0 +1,101 @@
+import datetime
+
+import pytest
+from api.changes import make_cursor
+from django.core import signing
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.changes import prune_changes, record_changes
+from reviews.models import Change
+
+URL = '/api/v1/changes/'
+Resource = Change.ResourceChoices
+Action = Change.ActionChoices
+
+
+@pytest.mark.django_db
+class TestChangeFeed:
+
+    @pytest.fixture(autouse=True)
+    def settled(self, settings):
+        settings.CHANGES_SETTLE_SECONDS = 0
+        Change.objects.all().delete()
+
+    def page(self, client, cursor=None, limit=2):
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        response = client.get(URL, params)
+        assert response.status_code == 200
+        return response.json()
+
+    def test_paging(self, admin_api):
+        record_changes(Resource.TITLE, [(1,), (2,)])
+        record_changes(Resource.REVIEW, [(5, 1)])
+        record_changes(Resource.TITLE, [(1,)], Action.DELETE)
+        first = self.page(admin_api)
+        assert [change['id'] for change in first['changes']] == [1, 2]
+        assert first['has_more'] is True
+        second = self.page(admin_api, first['next_cursor'])
+        assert second['changes'] == [
+            {'resource': 'review', 'action': 'upsert', 'id': 5,
+             'title_id': 1, 'changed_at': second['changes'][0]['changed_at']},
+            {'resource': 'title', 'action': 'delete', 'id': 1,
+             'changed_at': second['changes'][1]['changed_at']},
+        ], 'Проверьте, что курсор продолжает журнал с места остановки'
+        assert second['has_more'] is False
+        last = self.page(admin_api, second['next_cursor'])
+        assert last['changes'] == []
+        record_changes(Resource.GENRE, [(3,)])
+        resumed = self.page(admin_api, last['next_cursor'])['changes']
+        assert [change['id'] for change in resumed] == [3], (
+            'Проверьте, что курсор пустой пачки не теряет новые изменения'
+        )
+
+    def test_collapsed(self, admin_api):
+        record_changes(Resource.TITLE, [(1,), (2,)])
+        record_changes(Resource.TITLE, [(1,)], Action.DELETE)
+        changes = self.page(admin_api, limit=10)['changes']
+        assert [(change['id'], change['action']) for change in changes] == [
+            (2, 'upsert'), (1, 'delete')
+        ], 'Проверьте, что повторы объекта схлопываются в последнее изменение'
+
+    def test_not_settled(self, admin_api, settings):
+        settings.CHANGES_SETTLE_SECONDS = 60
+        record_changes(Resource.TITLE, [(1,)])
+        assert self.page(admin_api)['changes'] == [], (
+            'Проверьте, что свежие изменения отдаются после выдержки'
+        )
+
+    def test_bad_cursor(self, admin_api):
+        response = admin_api.get(URL, {'cursor': 'испорчен'})
+        assert response.status_code == 400
+
+    def test_expired_cursor(self, admin_api, settings, monkeypatch):
+        past = timezone.now() - datetime.timedelta(
+            days=settings.CHANGES_RETENTION_DAYS + 1
+        )
+        monkeypatch.setattr(signing.time, 'time', past.timestamp)
+        cursor = make_cursor(1)
+        monkeypatch.undo()
+        response = admin_api.get(URL, {'cursor': cursor})
+        assert response.status_code == 410, (
+            'Проверьте, что курсор старше срока хранения журнала даёт 410'
+        )
+
+    def test_machine_clients_only(self, author):
+        client = APIClient()
+        client.force_authenticate(author)
+        assert client.get(URL).status_code == 403
+
+    def test_prune(self, settings):
+        record_changes(Resource.TITLE, [(1,), (2,)])
+        Change.objects.filter(object_id=1).update(
+            changed_at=timezone.now() - datetime.timedelta(
+                days=settings.CHANGES_RETENTION_DAYS + 1
+            )
+        )
+        assert prune_changes() == 1
+        assert list(Change.objects.values_list('object_id', flat=True)) == [
+            2
+        ], 'Проверьте, что удаляются только записи старше срока хранения'
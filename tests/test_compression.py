@@ -0,0 +1,61 @@
+import gzip
+
+import pytest
+from api.compression import CODECS
+
+BROTLI = pytest.mark.skipif('br' not in CODECS,
+                            reason='brotli не установлен')
+
+
+@pytest.mark.django_db
+class TestCompression:
+
+    @pytest.fixture
+    def url(self, title):
+        return f'/api/v1/titles/{title.pk}/'
+
+    def test_gzip(self, admin_api, url, settings):
+        settings.COMPRESSION_MIN_SIZE = 1
+        plain = admin_api.get(url)
+        response = admin_api.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        assert gzip.decompress(response.content) == plain.content, (
+            'Проверьте, что сжатый ответ разжимается в исходный'
+        )
+        assert response['ETag'] == f'{plain["ETag"][:-1]}-gzip"', (
+            'Проверьте, что у ETag сжатого ответа есть суффикс кодировки'
+        )
+
+    def test_below_threshold(self, admin_api, url, settings):
+        settings.COMPRESSION_MIN_SIZE = 10 ** 6
+        response = admin_api.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы меньше порога не сжимаются'
+        )
+
+    def test_refused_encoding(self, admin_api, url, settings):
+        settings.COMPRESSION_MIN_SIZE = 1
+        response = admin_api.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0')
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что кодировки с q=0 не используются'
+        )
+
+    @BROTLI
+    def test_brotli_preferred(self, admin_api, url, settings):
+        import brotli
+        settings.COMPRESSION_MIN_SIZE = 1
+        plain = admin_api.get(url)
+        response = admin_api.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        assert response['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.content) == plain.content
+
+    def test_not_modified(self, admin_api, url, settings):
+        settings.COMPRESSION_MIN_SIZE = 1
+        etag = admin_api.get(url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        response = admin_api.get(url, HTTP_ACCEPT_ENCODING='gzip',
+                                 HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что ETag сжатого ответа принимается в If-None-Match'
+        )
+        assert response['ETag'] == etag
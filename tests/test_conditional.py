@@ -0,0 +1,80 @@
+import pytest
+from api.mixins import ConditionalMixin
+from rest_framework import viewsets
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from reviews.models import Review
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalRequests:
+
+    @pytest.fixture
+    def review(self, title, author):
+        return Review.objects.create(title=title, author=author,
+                                     text='Отзыв', score=8)
+
+    def test_title_not_modified(self, admin_api, title):
+        url = f'/api/v1/titles/{title.pk}/'
+        response = admin_api.get(url)
+        etag = response['ETag']
+        assert response.has_header('Last-Modified')
+        response = admin_api.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что неизменённое произведение отдаёт 304'
+        )
+        assert response['ETag'] == etag
+        admin_api.patch(url, {'name': 'Новое название'}, format='json')
+        response = admin_api.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после изменения произведения ETag меняется'
+        )
+        assert response.json()['name'] == 'Новое название'
+
+    def test_reviews_list_changes(self, admin_api, title, review):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = admin_api.get(url)['ETag']
+        assert admin_api.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304
+        admin_api.post(url, {'text': 'Ещё отзыв', 'score': 3}, format='json')
+        response = admin_api.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый отзыв меняет ETag списка'
+        )
+        assert response.json()['count'] == 2
+
+    def test_stale_if_match(self, admin_api, title, review):
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/'
+        etag = admin_api.get(url)['ETag']
+        response = admin_api.patch(url, {'text': 'Правка'}, format='json',
+                                   HTTP_IF_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag, (
+            'Проверьте, что ответ на изменение содержит новый ETag'
+        )
+        response = admin_api.patch(url, {'text': 'Вторая правка'},
+                                   format='json', HTTP_IF_MATCH=etag)
+        assert response.status_code == 412, (
+            'Проверьте, что изменение с устаревшим If-Match получает 412'
+        )
+        review.refresh_from_db()
+        assert review.text == 'Правка'
+
+
+class TestConditionalDefaults:
+
+    class PlainViewSet(ConditionalMixin, viewsets.ViewSet):
+        permission_classes = ()
+
+        def list(self, request):
+            return Response([])
+
+    def test_without_version_resource(self):
+        view = self.PlainViewSet.as_view({'get': 'list'})
+        response = view(APIRequestFactory().get('/', HTTP_IF_NONE_MATCH='*'))
+        assert response.status_code == 200, (
+            'Проверьте, что без version_resource условные запросы '
+            'не обрабатываются'
+        )
+        assert not response.has_header('ETag')
@@ -0,0 +1,72 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.counters import reconcile_counters
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db
+class TestCounters:
+
+    def counts(self, title, review=None):
+        title.refresh_from_db()
+        if review is None:
+            return title.reviews_count
+        review.refresh_from_db()
+        return title.reviews_count, review.comments_count
+
+    def test_api_maintains_counters(self, admin_api, title):
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+        review_id = admin_api.post(reviews_url, {'text': 'Отзыв', 'score': 9},
+                                   format='json').json()['id']
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        comment_id = admin_api.post(comments_url, {'text': 'Комментарий'},
+                                    format='json').json()['id']
+        review = Review.objects.get(pk=review_id)
+        assert self.counts(title, review) == (1, 1), (
+            'Проверьте, что создание отзыва и комментария увеличивает '
+            'счётчики'
+        )
+        assert admin_api.get(reviews_url).json()['results'][0][
+            'comments_count'] == 1
+        admin_api.delete(f'{comments_url}{comment_id}/')
+        assert self.counts(title, review) == (1, 0), (
+            'Проверьте, что удаление комментария уменьшает счётчик'
+        )
+        admin_api.delete(f'{reviews_url}{review_id}/')
+        assert self.counts(title) == 0, (
+            'Проверьте, что удаление отзыва уменьшает счётчик'
+        )
+
+    def test_stale_instance_keeps_counter(self, title, author):
+        stale = Title.objects.get(pk=title.pk)
+        Review.objects.create(title=title, author=author, text='Отзыв',
+                              score=5)
+        stale.name = 'Новое название'
+        stale.save()
+        assert self.counts(title) == 1, (
+            'Проверьте, что сохранение устаревшего объекта не затирает '
+            'счётчик'
+        )
+
+    def test_reconcile(self, title, author):
+        review = Review.objects.create(title=title, author=author,
+                                       text='Отзыв', score=5)
+        Comment.objects.create(review=review, author=author, text='Текст')
+        Title.objects.filter(pk=title.pk).update(reviews_count=5)
+        Review.objects.filter(pk=review.pk).update(comments_count=-1)
+        fixed = reconcile_counters()
+        assert fixed == {Title: [title.pk], Review: [review.pk]}, (
+            'Проверьте, что reconcile_counters возвращает исправленные '
+            'строки'
+        )
+        assert self.counts(title, review) == (1, 1)
+        assert reconcile_counters() == {Title: [], Review: []}
+
+    def test_reconcile_command(self, title):
+        Title.objects.filter(pk=title.pk).update(reviews_count=3)
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        assert 'Fixed 1 title and 0 review counters' in out.getvalue()
+        assert self.counts(title) == 0
@@ -0,0 +1,24 @@
+import pytest
+from api.deletion import schedule_deletion
+from api.versions import versions
+from django.db import transaction
+from reviews.models import DeletionTask
+
+
+@pytest.mark.django_db(transaction=True)
+class TestScheduleDeletion:
+
+    def test_invalidates_after_commit(self, admin_api, title, monkeypatch):
+        monkeypatch.setattr('api.deletion.worker.submit', lambda pk: None)
+        url = f'/api/v1/titles/{title.pk}/'
+        assert admin_api.get(url).status_code == 200
+        resources = [('title', title.pk), ('facets',)]
+        before = versions.get_many(resources)
+        with transaction.atomic():
+            schedule_deletion(DeletionTask.TargetChoices.TITLE, title)
+            assert versions.get_many(resources) == before, (
+                'Проверьте, что кэши сбрасываются после фиксации скрытия'
+            )
+        assert all(old != new for old, new in
+                   zip(before, versions.get_many(resources)))
+        assert admin_api.get(url).status_code == 404
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+from api.broker import Subscription
+from api.events import broker, publish_event, title_channel, title_events
+from django.db import transaction
+from reviews.models import Comment, Review
+
+
+def scope():
+    return {'type': 'http', 'method': 'GET', 'headers': []}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleEvents:
+
+    @pytest.fixture
+    def published(self, monkeypatch):
+        messages = []
+        monkeypatch.setattr(broker, 'publish',
+                            lambda channel, message: messages.append(
+                                (channel, message)))
+        return messages
+
+    def test_published_after_commit(self, published, author, title):
+        with transaction.atomic():
+            review = Review.objects.create(title=title, author=author,
+                                           text='Отзыв', score=5)
+            assert published == [], (
+                'Проверьте, что событие уходит подписчикам после фиксации'
+            )
+        Comment.objects.create(review=review, author=author,
+                               text='Комментарий')
+        assert [channel for channel, _ in published] == [
+            title_channel(title.pk)
+        ] * 2
+        head, data = published[0][1].split(b'\n', 1)
+        assert head == b'event: review'
+        assert json.loads(data[len(b'data: '):])['id'] == review.pk
+        assert published[1][1].startswith(b'event: comment\n')
+
+    def test_not_published_on_rollback(self, published, author, title):
+        with transaction.atomic():
+            Review.objects.create(title=title, author=author, text='Отзыв',
+                                  score=5)
+            transaction.set_rollback(True)
+        assert published == [], (
+            'Проверьте, что отменённая запись не публикуется'
+        )
+
+    def test_stream(self, title):
+        event = {'type': 'review', 'id': 1, 'title': {'id': title.pk}}
+        sent = []
+
+        async def scenario():
+            disconnected = asyncio.Event()
+
+            async def receive():
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+                if message.get('body', b'').startswith(b'event:'):
+                    disconnected.set()
+
+            stream = asyncio.ensure_future(
+                title_events(scope(), receive, send, title.pk)
+            )
+            while not sent:
+                await asyncio.sleep(0.01)
+            publish_event(event)
+            await asyncio.wait_for(stream, 5)
+
+        asyncio.run(scenario())
+        assert sent[0]['status'] == 200
+        assert (b'content-type', b'text/event-stream') in sent[0]['headers']
+        assert sent[1]['body'].startswith(b'retry: ')
+        assert sent[2]['body'] == (
+            b'event: review\ndata: ' + json.dumps(
+                event, separators=(',', ':')
+            ).encode() + b'\n\n'
+        ), 'Проверьте, что подписчик получает опубликованное событие'
+        assert title_channel(title.pk) not in broker._subscriptions, (
+            'Проверьте, что отключившийся клиент отписывается'
+        )
+
+    def test_missing_title(self, title):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(title_events(scope(), None, send, title.pk + 1))
+        assert sent[0]['status'] == 404
+
+
+class TestSubscription:
+
+    def test_overflow(self):
+        async def scenario():
+            subscription = Subscription('title:1', 2)
+            for message in (b'1', b'2', b'3'):
+                subscription.put(message)
+            return [await subscription.get(), await subscription.get()]
+
+        assert asyncio.run(scenario()) == [b'2', b'3'], (
+            'Проверьте, что медленный подписчик теряет старые сообщения'
+        )
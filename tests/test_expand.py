@@ -0,0 +1,69 @@
+import pytest
+from reviews.models import Comment, Review
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExpandReviews:
+
+    @pytest.fixture
+    def reviews(self, title):
+        users = [User.objects.create(username=f'critic{n}',
+                                     email=f'critic{n}@yamdb.fake')
+                 for n in range(7)]
+        reviews = [Review.objects.create(title=title, author=user,
+                                         text='Отзыв', score=5)
+                   for user in users]
+        for user in users[:5]:
+            Comment.objects.create(review=reviews[-1], author=user,
+                                   text='Комментарий')
+        return reviews
+
+    def get(self, client, title, **params):
+        return client.get(f'/api/v1/titles/{title.pk}/', params)
+
+    @pytest.mark.parametrize('params', [{}, {'fields': 'id,name'}])
+    def test_limits(self, admin_api, title, reviews, settings, params):
+        data = self.get(admin_api, title, expand='reviews', **params).json()
+        expanded = data['reviews']
+        assert [review['id'] for review in expanded] == [
+            review.pk for review in reversed(reviews)
+        ][:settings.EXPAND_REVIEWS], (
+            'Проверьте, что встраиваются EXPAND_REVIEWS новейших отзывов'
+        )
+        newest = expanded[0]
+        assert newest['comments_count'] == 5
+        comments = Comment.objects.filter(review=reviews[-1]).order_by('-id')
+        assert [comment['id'] for comment in newest['comments']] == [
+            comment.pk for comment in comments
+        ][:settings.EXPAND_COMMENTS], (
+            'Проверьте, что встраиваются EXPAND_COMMENTS новейших '
+            'комментариев'
+        )
+        assert all(review['comments'] == [] for review in expanded[1:])
+
+    def test_constant_queries(self, admin_api, title, reviews, author,
+                              django_assert_max_num_queries):
+        for review in reviews:
+            Comment.objects.create(review=review, author=author,
+                                   text='Комментарий')
+        with django_assert_max_num_queries(8):
+            response = self.get(admin_api, title, expand='reviews')
+        assert response.status_code == 200
+
+    def test_not_requested(self, admin_api, title, reviews):
+        assert 'reviews' not in self.get(admin_api, title).json()
+
+    def test_unknown(self, admin_api, title):
+        response = self.get(admin_api, title, expand='reviews,comments')
+        assert response.status_code == 400
+
+    def test_etag_follows_comments(self, admin_api, title, reviews, author):
+        etag = self.get(admin_api, title, expand='reviews')['ETag']
+        assert self.get(admin_api, title)['ETag'] != etag
+        Comment.objects.create(review=reviews[-2], author=author,
+                               text='Комментарий')
+        assert self.get(admin_api, title, expand='reviews')['ETag'] != etag, (
+            'Проверьте, что ETag ответа с отзывами зависит от их '
+            'комментариев'
+        )
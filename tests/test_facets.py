@@ -0,0 +1,74 @@
+import pytest
+from reviews.models import Category, Genre, Title
+
+URL = '/api/v1/titles/'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFacets:
+
+    @pytest.fixture(autouse=True)
+    def catalogue(self):
+        movie = Category.objects.create(name='Фильмы', slug='movie')
+        book = Category.objects.create(name='Книги', slug='book')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        for name, year, category, genres in (
+            ('Первое', 2000, movie, [drama]),
+            ('Второе', 2000, movie, [drama, comedy]),
+            ('Третье', 2001, book, [comedy]),
+            ('Четвёртое', 2001, None, []),
+        ):
+            title = Title.objects.create(name=name, year=year,
+                                         category=category)
+            title.genre.set(genres)
+        self.movie = movie
+
+    def facets(self, client, **params):
+        return client.get(URL, {'facets': 'true', **params}).json()['facets']
+
+    def test_counts(self, admin_api):
+        assert self.facets(admin_api) == {
+            'genre': [
+                {'name': 'Драма', 'slug': 'drama', 'count': 2},
+                {'name': 'Комедия', 'slug': 'comedy', 'count': 2},
+            ],
+            'category': [
+                {'name': 'Фильмы', 'slug': 'movie', 'count': 2},
+                {'name': 'Книги', 'slug': 'book', 'count': 1},
+            ],
+            'year': [{'year': 2001, 'count': 2}, {'year': 2000, 'count': 2}],
+        }, 'Проверьте счётчики фасетов'
+        assert self.facets(admin_api, category='movie')['genre'] == [
+            {'name': 'Драма', 'slug': 'drama', 'count': 2},
+            {'name': 'Комедия', 'slug': 'comedy', 'count': 1},
+        ], 'Проверьте, что фасеты считаются по отфильтрованному списку'
+
+    def test_without_facets(self, admin_api):
+        assert 'facets' not in admin_api.get(URL).json()
+
+    def test_title_change(self, admin_api):
+        assert self.facets(admin_api)['year'][0] == {'year': 2001,
+                                                     'count': 2}
+        Title.objects.create(name='Пятое', year=2001, category=self.movie)
+        facets = self.facets(admin_api)
+        assert facets['year'][0] == {'year': 2001, 'count': 3}, (
+            'Проверьте, что новое произведение сбрасывает кэш фасетов'
+        )
+        assert facets['category'][0]['count'] == 3
+
+    def test_catalogue_change(self, admin_api):
+        self.facets(admin_api)
+        self.movie.name = 'Кино'
+        self.movie.save()
+        assert self.facets(admin_api)['category'][0]['name'] == 'Кино', (
+            'Проверьте, что переименование категории сбрасывает кэш фасетов'
+        )
+
+    def test_cached(self, admin_api, django_assert_max_num_queries):
+        self.facets(admin_api, category='movie')
+        with django_assert_max_num_queries(2):
+            cached = self.facets(admin_api, category='movie')
+        assert cached['category'] == [
+            {'name': 'Фильмы', 'slug': 'movie', 'count': 2}
+        ]
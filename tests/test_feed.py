@@ -0,0 +1,82 @@
+import datetime
+
+import pytest
+from api.feed import activity_feed
+from django.utils import timezone
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+URL = '/api/v1/activity/'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestActivityFeed:
+
+    @pytest.fixture
+    def authors(self):
+        return [User.objects.create(username=f'critic{n}',
+                                    email=f'critic{n}@yamdb.fake')
+                for n in range(5)]
+
+    def events(self, client, **params):
+        return [(event['type'], event['id'])
+                for event in client.get(URL, params).json()]
+
+    def test_newest_first(self, client, title, authors):
+        first = Review.objects.create(title=title, author=authors[0],
+                                      text='Отзыв', score=5)
+        comment = Comment.objects.create(review=first, author=authors[1],
+                                         text='Комментарий')
+        second = Review.objects.create(title=title, author=authors[1],
+                                       text='Отзыв', score=7)
+        expected = [('review', second.pk), ('comment', comment.pk),
+                    ('review', first.pk)]
+        assert self.events(client) == expected, (
+            'Проверьте, что новые события идут в начале ленты'
+        )
+        now = timezone.now()
+        for model, pk, minutes in ((Review, first.pk, 3),
+                                   (Comment, comment.pk, 2),
+                                   (Review, second.pk, 1)):
+            model.objects.filter(pk=pk).update(
+                pub_date=now - datetime.timedelta(minutes=minutes)
+            )
+        activity_feed.invalidate()
+        assert self.events(client) == expected, (
+            'Проверьте, что пересобранная лента упорядочена по дате'
+        )
+
+    def test_eviction(self, client, title, authors, settings,
+                      django_assert_num_queries):
+        settings.ACTIVITY_FEED_SIZE = 3
+        assert self.events(client) == []
+        reviews = [Review.objects.create(title=title, author=author,
+                                         text='Отзыв', score=5)
+                   for author in authors[:4]]
+        with django_assert_num_queries(0):
+            events = self.events(client, limit=100)
+        assert events == [('review', review.pk)
+                          for review in reversed(reviews[1:])], (
+            'Проверьте, что лента хранит не больше ACTIVITY_FEED_SIZE '
+            'последних событий'
+        )
+        assert self.events(client, limit=1) == [('review', reviews[-1].pk)]
+
+    def test_removed(self, client, title, authors):
+        review = Review.objects.create(title=title, author=authors[0],
+                                       text='Отзыв', score=5)
+        hidden = Title.objects.create(name='Скрытое', year=2000)
+        Review.objects.create(title=hidden, author=authors[0],
+                              text='Отзыв', score=5)
+        hidden.is_hidden = True
+        hidden.save()
+        assert self.events(client) == [('review', review.pk)], (
+            'Проверьте, что отзывы скрытых произведений пропадают из ленты'
+        )
+        review.delete()
+        assert self.events(client) == [], (
+            'Проверьте, что удалённые отзывы пропадают из ленты'
+        )
+
+    def test_invalid_limit(self, client):
+        assert client.get(URL, {'limit': 'many'}).status_code == 400
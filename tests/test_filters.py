@@ -0,0 +1,62 @@
+import pytest
+from reviews.models import Category, Genre, Title
+
+URL = '/api/v1/titles/'
+
+
+@pytest.mark.django_db
+class TestTitleFilters:
+
+    @pytest.fixture(autouse=True)
+    def catalogue(self):
+        movie = Category.objects.create(name='Фильмы', slug='movie')
+        book = Category.objects.create(name='Книги', slug='book')
+        Category.objects.create(name='Музыка', slug='music')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        for name, year, category, genres in (
+            ('Первое', 1999, movie, [drama]),
+            ('Второе', 2000, movie, [drama, comedy]),
+            ('Третье', 2001, book, [comedy]),
+            ('Четвёртое', 2002, None, []),
+        ):
+            title = Title.objects.create(name=name, year=year,
+                                         category=category)
+            title.genre.set(genres)
+
+    def names(self, client, **params):
+        return {item['name']
+                for item in client.get(URL, params).json()['results']}
+
+    @pytest.mark.parametrize('params, expected', [
+        ({'genre': 'drama'}, {'Первое', 'Второе'}),
+        ({'genre': 'drama,comedy'}, {'Первое', 'Второе', 'Третье'}),
+        ({'genre': 'drama,comedy', 'genre_match': 'all'}, {'Второе'}),
+        ({'genre': 'drama,unknown'}, {'Первое', 'Второе'}),
+        ({'genre': 'drama,unknown', 'genre_match': 'all'}, set()),
+        ({'genre': 'unknown'}, set()),
+        ({'category': 'movie,book'}, {'Первое', 'Второе', 'Третье'}),
+        ({'category': 'music'}, set()),
+        ({'category': 'unknown'}, set()),
+        ({'year_min': 2000, 'year_max': 2001}, {'Второе', 'Третье'}),
+        ({'year_min': 2001}, {'Третье', 'Четвёртое'}),
+        ({'year': 1999}, {'Первое'}),
+        ({'name': 'торое'}, {'Второе'}),
+        ({'genre': 'comedy', 'category': 'book'}, {'Третье'}),
+    ])
+    def test_filters(self, admin_api, params, expected):
+        assert self.names(admin_api, **params) == expected, (
+            f'Проверьте фильтрацию произведений по {params}'
+        )
+
+    def test_no_duplicates(self, admin_api):
+        response = admin_api.get(URL, {'genre': 'drama,comedy'}).json()
+        assert response['count'] == len(response['results']) == 3, (
+            'Проверьте, что произведение с несколькими подходящими жанрами '
+            'попадает в список один раз'
+        )
+
+    def test_invalid_match(self, admin_api):
+        response = admin_api.get(URL, {'genre': 'drama',
+                                       'genre_match': 'some'})
+        assert response.status_code == 400
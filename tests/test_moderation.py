@@ -0,0 +1,92 @@
+import pytest
+from reviews.models import AuthorRollup, Change, Comment, Review, Title
+from users.models import User
+
+MODERATION_URL = '/api/v1/moderation/delete/'
+
+
+@pytest.mark.django_db
+class TestModeration:
+
+    @pytest.fixture
+    def reviews(self, title, author):
+        other = User.objects.create(username='other', email='other@yamdb.fake')
+        first = Review.objects.create(title=title, author=other,
+                                      text='Первый', score=5)
+        second = Review.objects.create(title=title, author=author,
+                                       text='Второй', score=7)
+        for review, user, count in ((first, author, 3), (first, other, 1),
+                                    (second, author, 2)):
+            for n in range(count):
+                Comment.objects.create(review=review, author=user,
+                                       text=f'Комментарий {n}')
+        return first, second
+
+    def test_delete_comments_by_author(self, admin_api, author, reviews):
+        first, second = reviews
+        response = admin_api.post(MODERATION_URL, {
+            'target': 'comments', 'author': author.username
+        }, format='json')
+        assert response.status_code == 200
+        assert response.json() == {'reviews': 0, 'comments': 5}, (
+            'Проверьте, что ответ содержит число удалённых комментариев'
+        )
+        assert Comment.objects.count() == 1
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.comments_count, second.comments_count) == (1, 0), (
+            'Проверьте, что счётчики комментариев отзывов поправлены'
+        )
+        assert AuthorRollup.objects.get(user=author).comments_count == 0
+        assert Change.objects.filter(
+            resource=Change.ResourceChoices.COMMENT,
+            action=Change.ActionChoices.DELETE
+        ).count() == 5, 'Проверьте, что удаления записаны в журнал'
+
+    def test_criteria_evaluated_once(self, admin_api, author, reviews):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as context:
+            admin_api.post(MODERATION_URL, {
+                'target': 'comments', 'author': author.username
+            }, format='json')
+        assert len([
+            query for query in context.captured_queries
+            if '"username" =' in query['sql']
+            and 'reviews_comment' in query['sql']
+        ]) == 1, 'Проверьте, что критерии удаления вычисляются один раз'
+
+    def test_delete_reviews_by_title(self, admin_api, title, reviews):
+        response = admin_api.post(MODERATION_URL, {
+            'target': 'reviews', 'title': title.pk
+        }, format='json')
+        assert response.json() == {'reviews': 2, 'comments': 6}, (
+            'Проверьте, что ответ содержит число удалённых отзывов '
+            'и их комментариев'
+        )
+        assert not Review.objects.exists() and not Comment.objects.exists()
+        assert Title.objects.get(pk=title.pk).reviews_count == 0, (
+            'Проверьте, что счётчик отзывов произведения поправлен'
+        )
+
+    def test_nothing_matched(self, admin_api, reviews):
+        response = admin_api.post(MODERATION_URL, {
+            'target': 'comments', 'ids': [10 ** 6]
+        }, format='json')
+        assert response.json() == {'reviews': 0, 'comments': 0}
+        assert Comment.objects.count() == 6
+
+    def test_criteria_required(self, admin_api):
+        response = admin_api.post(MODERATION_URL, {'target': 'comments'},
+                                  format='json')
+        assert response.status_code == 400
+
+    def test_forbidden_for_user(self, author, reviews):
+        from rest_framework.test import APIClient
+        client = APIClient()
+        client.force_authenticate(author)
+        response = client.post(MODERATION_URL, {
+            'target': 'comments', 'author': author.username
+        }, format='json')
+        assert response.status_code == 403
+        assert Comment.objects.count() == 6
@@ -0,0 +1,62 @@
+import datetime
+
+from api.readers import (CommentValuesReader, ReviewValuesReader,
+                         TitleValuesReader)
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleListSerializer)
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from reviews.catalogue import CatalogueSnapshot, catalogue
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from users.models import User
+
+
+class TestValuesReaders:
+    """Быстрые читатели должны отдавать тот же JSON, что и сериализаторы."""
+
+    renderer = JSONRenderer()
+    pub_date = datetime.datetime(2022, 12, 14, 10, 42, 5, 123456,
+                                 tzinfo=timezone.utc)
+
+    def assert_same_json(self, serializer_data, reader_data):
+        assert (self.renderer.render(serializer_data)
+                == self.renderer.render(reader_data)), (
+            'Проверьте, что быстрый читатель повторяет вывод сериализатора'
+        )
+
+    def test_review_reader(self):
+        review = Review(id=3, author=User(username='reader'), text='Текст',
+                        pub_date=self.pub_date, score=7, comments_count=2)
+        row = {'id': 3, 'author__username': 'reader', 'text': 'Текст',
+               'pub_date': self.pub_date, 'score': 7, 'comments_count': 2}
+        self.assert_same_json(ReviewSerializer(review).data,
+                              ReviewValuesReader().represent(row))
+
+    def test_comment_reader(self):
+        comment = Comment(id=5, author=User(username='reader'), text='Текст',
+                          pub_date=self.pub_date)
+        row = {'id': 5, 'author__username': 'reader', 'text': 'Текст',
+               'pub_date': self.pub_date}
+        self.assert_same_json(CommentSerializer(comment).data,
+                              CommentValuesReader().represent(row))
+
+    def test_title_reader(self, monkeypatch):
+        genres = [Genre(id=1, name='Драма', slug='drama'),
+                  Genre(id=2, name='Комедия', slug='comedy')]
+        categories = [Category(id=1, name='Фильм', slug='movie')]
+        snapshot = CatalogueSnapshot('test', genres, categories)
+        monkeypatch.setattr(catalogue, 'snapshot', lambda: snapshot)
+
+        title = Title(id=9, name='Название', year=2000, description='',
+                      category_id=1, reviews_count=4)
+        title.rating = 7.5
+        title._prefetched_objects_cache = {'titlegenre_set': [
+            TitleGenre(title_id=9, genre_id=1),
+            TitleGenre(title_id=9, genre_id=2),
+        ]}
+        row = {'id': 9, 'name': 'Название', 'year': 2000, 'rating': 7.5,
+               'reviews_count': 4, 'description': '', 'category_id': 1}
+        self.assert_same_json(
+            TitleListSerializer(title).data,
+            TitleValuesReader().represent(row, genre_ids=[1, 2])
+        )
@@ -0,0 +1,102 @@
+import pytest
+from reviews import recommendations
+from reviews.models import NeighbourLink, Review, Title, TitleNeighbours
+from reviews.recommendations import (affected_titles, build_neighbours,
+                                     mark_neighbours_stale,
+                                     refresh_stale_neighbours)
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestStaleNeighbours:
+
+    @pytest.fixture
+    def catalogue(self):
+        titles = [Title.objects.create(name=f'Произведение {n}', year=2000)
+                  for n in range(4)]
+        users = [User.objects.create(username=f'critic{n}',
+                                     email=f'critic{n}@yamdb.fake')
+                 for n in range(3)]
+        scores = {(0, 0): 9, (0, 1): 8, (1, 0): 10, (1, 2): 7,
+                  (2, 1): 9, (2, 2): 8, (3, 2): 10}
+        reviews = {
+            key: Review.objects.create(title=titles[key[0]],
+                                       author=users[key[1]],
+                                       text='Отзыв', score=score)
+            for key, score in scores.items()
+        }
+        build_neighbours()
+        return titles, reviews
+
+    def stored(self):
+        return dict(TitleNeighbours.objects.values_list('title_id',
+                                                        'neighbours'))
+
+    def assert_same_as_rebuild(self):
+        refreshed = self.stored()
+        assert set(NeighbourLink.objects.values_list(
+            'title_id', 'neighbour_id'
+        )) == {
+            (pk, entry[0]) for pk, neighbours in refreshed.items()
+            for entry in neighbours
+        }, 'Проверьте, что обратный индекс совпадает со списками соседей'
+        build_neighbours()
+        assert refreshed == self.stored(), (
+            'Проверьте, что пересчёт устаревших соседей совпадает '
+            'с полным пересчётом'
+        )
+
+    def test_removed_similarity(self, catalogue):
+        titles, reviews = catalogue
+        reviews[(0, 0)].delete()
+        mark_neighbours_stale(titles[0].pk)
+        assert titles[0].pk in dict(self.stored()[titles[1].pk])
+        assert refresh_stale_neighbours() == 1
+        assert titles[0].pk not in dict(self.stored()[titles[1].pk]), (
+            'Проверьте, что пропавшее сходство удаляется из списков '
+            'соседей'
+        )
+        self.assert_same_as_rebuild()
+
+    def test_changed_score(self, catalogue):
+        titles, reviews = catalogue
+        reviews[(3, 2)].score = 7
+        reviews[(3, 2)].save()
+        Review.objects.create(title=titles[3], author=reviews[(0, 0)].author,
+                              text='Отзыв', score=9)
+        mark_neighbours_stale(titles[3].pk)
+        refresh_stale_neighbours()
+        assert not TitleNeighbours.objects.filter(stale=True).exists()
+        self.assert_same_as_rebuild()
+
+    def test_affected_by_index(self, catalogue):
+        titles, reviews = catalogue
+        reviews[(0, 0)].delete()
+        reviews[(0, 1)].delete()
+        assert affected_titles({titles[0].pk}) == {
+            titles[0].pk, titles[1].pk, titles[2].pk
+        }, (
+            'Проверьте, что затронуты произведения, в списках которых '
+            'упомянуто изменившееся'
+        )
+
+    def test_deleted_during_refresh(self, catalogue, monkeypatch):
+        titles, reviews = catalogue
+        rows = recommendations.neighbour_rows
+
+        def delete_title(pks):
+            fresh = rows(pks)
+            Title.objects.filter(pk=titles[2].pk).delete()
+            return fresh
+
+        monkeypatch.setattr(recommendations, 'neighbour_rows', delete_title)
+        mark_neighbours_stale(titles[1].pk)
+        refresh_stale_neighbours()
+        stored = self.stored()
+        assert titles[2].pk not in stored
+        assert all(entry[0] != titles[2].pk
+                   for neighbours in stored.values()
+                   for entry in neighbours), (
+            'Проверьте, что соседи удалённых произведений не сохраняются'
+        )
+        self.assert_same_as_rebuild()
@@ -0,0 +1,60 @@
+import datetime
+from decimal import Decimal
+
+import msgpack
+import pytest
+from api.renderers import FastJSONRenderer
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+
+class TestFastJSONRenderer:
+
+    def test_same_output_as_json_renderer(self):
+        data = {
+            'pub_date': datetime.datetime(2022, 12, 14, 10, 42, 5, 123456,
+                                          tzinfo=timezone.utc),
+            'day': datetime.date(2022, 12, 14),
+            'rating': Decimal('7.5'),
+            'detail': gettext_lazy('Not found.'),
+            'text': 'Отзыв\u2028с разделителем',
+            'genre': [{'name': 'Драма', 'slug': 'drama'}],
+            'previous': None,
+        }
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data), (
+            'Проверьте, что FastJSONRenderer выдаёт тот же JSON, что и JSONRenderer'
+        )
+
+
+@pytest.mark.django_db
+class TestMessagePack:
+    MEDIA_TYPE = 'application/msgpack'
+
+    def test_same_data_as_json(self, admin_api, title):
+        url = f'/api/v1/titles/{title.pk}/'
+        response = admin_api.get(url, HTTP_ACCEPT=self.MEDIA_TYPE)
+        assert response['Content-Type'] == self.MEDIA_TYPE
+        assert msgpack.unpackb(response.content) == admin_api.get(
+            url
+        ).json(), 'Проверьте, что MessagePack повторяет структуру JSON'
+
+    def test_body(self, admin_api):
+        response = admin_api.post(
+            '/api/v1/genres/',
+            msgpack.packb({'name': 'Драма', 'slug': 'drama'}),
+            content_type=self.MEDIA_TYPE, HTTP_ACCEPT=self.MEDIA_TYPE,
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что тело запроса принимается в MessagePack'
+        )
+        assert msgpack.unpackb(response.content) == {
+            'name': 'Драма', 'slug': 'drama'
+        }
+
+    def test_malformed_body(self, admin_api):
+        response = admin_api.post('/api/v1/genres/', b'\xc1',
+                                  content_type=self.MEDIA_TYPE)
+        assert response.status_code == 400, (
+            'Проверьте, что испорченное тело MessagePack даёт 400'
+        )
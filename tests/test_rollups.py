@@ -0,0 +1,77 @@
+import pytest
+from api.deletion import run_deletion, schedule_deletion
+from reviews.models import Category, DeletionTask, Genre, Review, ScoreRollup
+from reviews.rollups import rebuild_rollups
+
+BULK_URL = '/api/v1/titles/bulk/'
+
+
+def rollups():
+    return set(ScoreRollup.objects.filter(count__gt=0).values_list(
+        'dimension', 'key', 'count', 'total'
+    ))
+
+
+@pytest.mark.django_db
+class TestScoreRollups:
+
+    @pytest.fixture(autouse=True)
+    def reviewed(self, author, admin, title):
+        self.movie = Category.objects.create(name='Фильмы', slug='movie')
+        self.book = Category.objects.create(name='Книги', slug='book')
+        self.drama = Genre.objects.create(name='Драма', slug='drama')
+        self.comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        title.category = self.movie
+        title.save()
+        title.genre.set([self.drama])
+        for user, score in ((author, 4), (admin, 9)):
+            Review.objects.create(title=title, author=user, text='Отзыв',
+                                  score=score)
+
+    def assert_consistent(self, expected):
+        incremental = rollups()
+        rebuild_rollups()
+        assert incremental == rollups(), (
+            'Проверьте, что сводные оценки по разрезам переносятся при '
+            'изменении произведения без пересчёта'
+        )
+        assert {
+            (dimension, key) for dimension, key, count, total in incremental
+            if count == 2 and total == 13
+        } == expected
+
+    def test_patch(self, admin_api, title):
+        response = admin_api.patch(f'/api/v1/titles/{title.pk}/', {
+            'category': 'book', 'year': 2001, 'genre': ['comedy'],
+        }, format='json')
+        assert response.status_code == 200
+        self.assert_consistent({
+            ('year', 2001), ('category', self.book.pk),
+            ('genre', self.comedy.pk),
+        })
+
+    def test_genre_links(self, title):
+        self.comedy.title_set.add(title)
+        title.genre.remove(self.drama, self.movie.pk + 100)
+        self.assert_consistent({
+            ('year', 2000), ('category', self.movie.pk),
+            ('genre', self.comedy.pk),
+        })
+        title.genre.clear()
+        self.assert_consistent({('year', 2000), ('category', self.movie.pk)})
+
+    def test_bulk(self, admin_api, title):
+        response = admin_api.post(BULK_URL, [
+            {'id': title.pk, 'year': 1999, 'genre': ['drama', 'comedy']},
+        ], format='json')
+        assert response.status_code == 200
+        self.assert_consistent({
+            ('year', 1999), ('category', self.movie.pk),
+            ('genre', self.drama.pk), ('genre', self.comedy.pk),
+        })
+
+    def test_category_deletion(self, monkeypatch):
+        monkeypatch.setattr('api.deletion.worker.submit', lambda pk: None)
+        run_deletion(schedule_deletion(DeletionTask.TargetChoices.CATEGORY,
+                                       self.movie))
+        self.assert_consistent({('year', 2000), ('genre', self.drama.pk)})
@@ -0,0 +1,77 @@
+import pytest
+from reviews.models import Review, TitleScoreCount, TitleScoreStats
+from reviews.stats import refresh_score_stats, title_histogram, weighted_score
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestScoreStats:
+
+    def stats(self, title):
+        stats = TitleScoreStats.objects.filter(title=title).values_list(
+            'count', 'total', 'weighted'
+        ).first()
+        return stats, title_histogram(title.pk)
+
+    def assert_same_as_rebuild(self, title):
+        incremental = self.stats(title)
+        refresh_score_stats(title.pk)
+        assert incremental == self.stats(title), (
+            'Проверьте, что статистика при записи отзывов совпадает '
+            'с полным пересчётом'
+        )
+
+    def make_reviews(self, title, scores):
+        return [Review.objects.create(
+            title=title, text='Отзыв', score=score,
+            author=User.objects.create(username=f'critic{n}',
+                                       email=f'critic{n}@yamdb.fake')
+        ) for n, score in enumerate(scores)]
+
+    def test_incremental_updates(self, title):
+        reviews = self.make_reviews(title, [10, 10, 4])
+        (count, total, weighted), histogram = self.stats(title)
+        assert (count, total, histogram) == (3, 24, {10: 2, 4: 1})
+        assert weighted == pytest.approx(weighted_score(3, 24))
+        reviews[0].score = 6
+        reviews[0].save()
+        assert self.stats(title)[1] == {10: 1, 6: 1, 4: 1}, (
+            'Проверьте, что изменение оценки переносит отзыв '
+            'в другую строку гистограммы'
+        )
+        self.assert_same_as_rebuild(title)
+        reviews[2].delete()
+        self.assert_same_as_rebuild(title)
+        for review in reviews[:2]:
+            review.delete()
+        (count, total, weighted), histogram = self.stats(title)
+        assert (count, total, weighted) == (0, 0, 0)
+        assert not any(histogram.values())
+
+    def test_no_aggregate_on_write(self, title):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self.make_reviews(title, [8])
+        user = User.objects.create(username='late', email='late@yamdb.fake')
+        with CaptureQueriesContext(connection) as context:
+            Review.objects.create(title=title, author=user, text='Отзыв',
+                                  score=9)
+        assert not [
+            query for query in context.captured_queries
+            if 'GROUP BY' in query['sql'] or 'FOR UPDATE' in query['sql']
+        ], 'Проверьте, что запись отзыва не пересчитывает оценки по отзывам'
+
+    def test_moderation(self, admin_api, title):
+        self.make_reviews(title, [7, 3, 3])
+        admin_api.post('/api/v1/moderation/delete/', {
+            'target': 'reviews', 'author': 'critic1'
+        }, format='json')
+        assert self.stats(title)[1] == {7: 1, 3: 1}
+        self.assert_same_as_rebuild(title)
+
+    def test_detail_scores(self, admin_api, title):
+        self.make_reviews(title, [5, 5])
+        scores = admin_api.get(f'/api/v1/titles/{title.pk}/').json()['scores']
+        assert scores == {str(score): 2 if score == 5 else 0
+                          for score in range(1, 11)}
+        assert TitleScoreCount.objects.count() == 1
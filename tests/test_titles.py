@@ -0,0 +1,66 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleLookup:
+
+    @pytest.mark.parametrize('path', [
+        '/api/v1/titles/abc/',
+        '/api/v1/titles/abc/similar/',
+        '/api/v1/titles/abc/?expand=reviews',
+        '/api/v1/titles/1/reviews/abc/',
+        '/api/v1/titles/1/reviews/1/comments/abc/',
+    ])
+    def test_non_numeric_pk(self, admin_api, title, path):
+        response = admin_api.get(path)
+        assert response.status_code == 404, (
+            'Проверьте, что нечисловой id в адресе возвращает 404'
+        )
+
+
+@pytest.mark.django_db
+class TestTitleFields:
+
+    def count_queries(self, client, path):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(path)
+        assert response.status_code == 200
+        return len(context), response.json()
+
+    def test_reviews_count_not_deferred(self, admin_api, title):
+        path = f'/api/v1/titles/{title.pk}/?fields=id,name'
+        queries, _ = self.count_queries(admin_api, path)
+        queries_with_count, data = self.count_queries(
+            admin_api, path + ',reviews_count'
+        )
+        assert queries_with_count == queries, (
+            'Проверьте, что reviews_count выбирается вместе с произведением, '
+            'а не отдельным запросом'
+        )
+        assert data == {'id': title.pk, 'name': title.name,
+                        'reviews_count': 0}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestInvalidationAfterCommit:
+
+    def test_title_save(self, title):
+        from api.fragments import fragment_store
+        from api.versions import versions
+        from django.db import transaction
+        fragment_store.get(title.pk)
+        before = versions.get_many([('title', title.pk), ('facets',)])
+        with transaction.atomic():
+            title.name = 'Новое название'
+            title.save()
+            assert versions.get_many(
+                [('title', title.pk), ('facets',)]
+            ) == before, 'Проверьте, что версии меняются после фиксации'
+            assert fragment_store.peek(title.pk) is not None
+        after = versions.get_many([('title', title.pk), ('facets',)])
+        assert all(old != new for old, new in zip(before, after))
+        assert fragment_store.peek(title.pk) is None, (
+            'Проверьте, что фрагмент сбрасывается после фиксации'
+        )
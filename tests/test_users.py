@@ -0,0 +1,88 @@
+import pytest
+from reviews.models import DeletionTask, Review
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestUserList:
+
+    def usernames(self, client):
+        return {user['username']
+                for user in client.get('/api/v1/users/').json()['results']}
+
+    def test_deactivated_user_visible(self, admin_api, author):
+        author.is_active = False
+        author.save()
+        assert 'author' in self.usernames(admin_api), (
+            'Проверьте, что деактивированный пользователь виден '
+            'администратору'
+        )
+        assert admin_api.get('/api/v1/users/author/').status_code == 200
+
+    def test_user_being_deleted_hidden(self, admin_api, author):
+        response = admin_api.delete('/api/v1/users/author/?background=true')
+        assert response.status_code == 202
+        assert 'author' not in self.usernames(admin_api), (
+            'Проверьте, что удаляемый в фоне пользователь скрыт'
+        )
+        assert admin_api.get('/api/v1/users/author/').status_code == 404
+
+    def test_failed_deletion_visible(self, admin_api, author):
+        User.objects.filter(pk=author.pk).update(is_active=False)
+        DeletionTask.objects.create(
+            target=DeletionTask.TargetChoices.USER, object_id=author.pk,
+            status=DeletionTask.StatusChoices.FAILED
+        )
+        assert 'author' in self.usernames(admin_api)
+
+    def test_analytics_reviewers(self, admin_api, author, title, monkeypatch):
+        monkeypatch.setattr('api.deletion.worker.submit', lambda pk: None)
+        Review.objects.create(title=title, author=author, text='Отзыв',
+                              score=5)
+        url = '/api/v1/analytics/reviewers/'
+        User.objects.filter(pk=author.pk).update(is_active=False)
+        assert [row['username'] for row in admin_api.get(url).json()] == [
+            'author'
+        ], 'Проверьте, что деактивированный автор остаётся в аналитике'
+        admin_api.delete('/api/v1/users/author/?background=true')
+        assert admin_api.get(url).json() == [], (
+            'Проверьте, что удаляемый в фоне автор скрыт из аналитики'
+        )
+
+
+@pytest.mark.django_db
+class TestUsernameChange:
+
+    @pytest.fixture
+    def review(self, author, title):
+        return Review.objects.create(title=title, author=author,
+                                     text='Отзыв', score=5)
+
+    def review_changes(self):
+        from reviews.models import Change
+        return Change.objects.filter(
+            resource=Change.ResourceChoices.REVIEW
+        ).count()
+
+    def test_other_fields_skip(self, admin_api, author, review):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        before = self.review_changes()
+        with CaptureQueriesContext(connection) as context:
+            admin_api.patch('/api/v1/users/author/', {'bio': 'Критик'},
+                            format='json')
+            author.refresh_from_db()
+            author.save()
+        assert self.review_changes() == before
+        assert not [query for query in context.captured_queries
+                    if 'reviews_review' in query['sql']], (
+            'Проверьте, что без смены имени отзывы автора не перебираются'
+        )
+
+    def test_username_change(self, admin_api, author, review):
+        before = self.review_changes()
+        admin_api.patch('/api/v1/users/author/', {'username': 'critic'},
+                        format='json')
+        assert self.review_changes() == before + 1, (
+            'Проверьте, что смена имени записывает изменения отзывов'
+        )